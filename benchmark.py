@@ -0,0 +1,493 @@
+"""Offline load simulation for the suggestion, vote and decision paths.
+
+Drives the real handlers in main.py with fake Discord objects against a
+temporary SQLite file, so performance changes can be measured without a
+Discord connection:
+
+    python benchmark.py --guilds 5 --suggestions 200 --voters 2000 --votes 20000
+
+Reports per-path handler latency (p50/p99/max), event-loop stall time, DB
+operations per interaction and the number of message edits issued.
+
+With --vote-layout it instead compares the size and lookup speed of the
+same votes stored before and after the compact votes migration:
+
+    python benchmark.py --vote-layout --suggestions 2000 --votes 1000000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--guilds', type=int, default=5)
+    parser.add_argument('--suggestions', type=int, default=200,
+                        help='suggestions submitted across all guilds')
+    parser.add_argument('--voters', type=int, default=2000,
+                        help='distinct users clicking vote buttons')
+    parser.add_argument('--votes', type=int, default=20000,
+                        help='total vote button clicks')
+    parser.add_argument('--hot', type=float, default=0.5,
+                        help='share of clicks that land on one hot suggestion')
+    parser.add_argument('--decide', type=float, default=0.5,
+                        help='share of suggestions approved or rejected')
+    parser.add_argument('--concurrency', type=int, default=200,
+                        help='interactions in flight at once')
+    parser.add_argument('--rest-latency', type=float, default=0.05,
+                        help='simulated Discord REST round-trip in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vote-layout', action='store_true',
+                        help='compare the text and compact votes tables '
+                             'instead of simulating interactions')
+    parser.add_argument('--keep', action='store_true',
+                        help='keep the scratch database directory')
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# main.py reads its configuration at import time. With DATABASE_URL set the
+# benchmark runs against that PostgreSQL database instead; use a scratch one.
+workdir = tempfile.mkdtemp(prefix='suggestions-bench-')
+os.environ['DB_PATH'] = os.path.join(workdir, 'bench.db')
+os.environ['VOTE_JOURNAL_PATH'] = os.path.join(workdir, 'votes-journal')
+os.environ.setdefault('DISCORD_TOKEN', 'benchmark')
+# Half the clicks land on one suggestion, far past its default rate limit;
+# set this to measure the limiter instead of the vote path
+os.environ.setdefault('SUGGESTION_VOTE_RATE_LIMIT', '0')
+
+import main  # noqa: E402
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.db_ops = 0
+        self.rest_calls = defaultdict(int)
+        self.stall_total = 0.0
+        self.stall_max = 0.0
+
+    def rest(self, name):
+        self.rest_calls[name] += 1
+        return asyncio.sleep(args.rest_latency)
+
+
+stats = Stats()
+ids = itertools.count(10_000)
+channels = {}
+
+
+# Fake Discord objects: just enough surface for the handlers in main.py
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, *args, **kwargs):
+        self._done = True
+        await stats.rest('interaction_response')
+
+    async def send_modal(self, modal):
+        self._done = True
+        await stats.rest('interaction_response')
+
+    async def defer(self, *args, **kwargs):
+        self._done = True
+        await stats.rest('interaction_response')
+
+
+class FakeFollowup:
+    async def send(self, *args, **kwargs):
+        await stats.rest('followup')
+
+
+class FakeThread:
+    def __init__(self, guild, name):
+        self.id = next(ids)
+        self.guild = guild
+        self.name = name
+
+    async def edit(self, **kwargs):
+        await stats.rest('thread_edit')
+
+
+class FakeMessage:
+    def __init__(self, channel, embed, view):
+        self.id = next(ids)
+        self.channel = channel
+        self.guild = channel.guild
+        self.embeds = [embed]
+        self.suggestion_id = getattr(view, 'suggestion_id', None)
+
+    async def edit(self, embed=None, **kwargs):
+        if embed is not None:
+            self.embeds = [embed]
+        await stats.rest('message_edit')
+
+    async def create_thread(self, name, **kwargs):
+        await stats.rest('create_thread')
+        thread = FakeThread(self.guild, name)
+        self.guild.channels[thread.id] = thread
+        return thread
+
+
+class FakePermissions:
+    def __getattr__(self, name):
+        return True
+
+
+class FakeChannel:
+    def __init__(self, guild):
+        self.id = next(ids)
+        self.guild = guild
+        self.mention = f'<#{self.id}>'
+        self.messages = {}
+        channels[self.id] = self
+
+    def permissions_for(self, member):
+        return FakePermissions()
+
+    async def send(self, embed=None, view=None, **kwargs):
+        await stats.rest('message_send')
+        message = FakeMessage(self, embed, view)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        await stats.rest('fetch_message')
+        return self.messages[message_id]
+
+    def get_partial_message(self, message_id):
+        return self.messages[message_id]
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = next(ids)
+        self.me = SimpleNamespace(id=1)
+        self.channels = {}
+        self.roles = {}
+        self.channel = FakeChannel(self)
+        self.channels[self.channel.id] = self.channel
+        self.reviewer_role = SimpleNamespace(id=next(ids))
+        self.roles[self.reviewer_role.id] = self.reviewer_role
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_channel_or_thread(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    async def fetch_channel(self, channel_id):
+        await stats.rest('fetch_channel')
+        return self.channels[channel_id]
+
+
+class FakeUser:
+    def __init__(self, user_id, roles=()):
+        self.id = user_id
+        self.display_name = f'user{user_id}'
+        self.mention = f'<@{user_id}>'
+        self.display_avatar = SimpleNamespace(
+            url=f'https://cdn.example/{user_id}.png')
+        self.roles = list(roles)
+        self.guild_permissions = SimpleNamespace(administrator=False)
+
+
+class FakeInteraction:
+    def __init__(self, guild, user, message=None):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.message = message
+        self.channel = message.channel if message else guild.channel
+        self.channel_id = self.channel.id
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+
+# Measurement
+def count_db_ops():
+    run = main.db.run
+
+    async def counted(func, *func_args):
+        stats.db_ops += 1
+        return await run(func, *func_args)
+
+    main.db.run = counted
+
+
+def fake_partial_messageable():
+    main.bot.get_partial_messageable = (
+        lambda channel_id, guild_id=None: channels[channel_id])
+
+
+async def watch_event_loop(interval=0.001):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stall = loop.time() - start - interval
+        if stall > interval:
+            stats.stall_total += stall
+            stats.stall_max = max(stats.stall_max, stall)
+
+
+async def timed(path, coro):
+    start = time.perf_counter()
+    await coro
+    stats.latencies[path].append(time.perf_counter() - start)
+
+
+async def run_phase(name, jobs):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    db_ops = stats.db_ops
+    rest = dict(stats.rest_calls)
+
+    async def bounded(path, coro):
+        async with semaphore:
+            await timed(path, coro)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(path, coro) for path, coro in jobs))
+    # Let buffered votes, coalesced edits and background Discord work land
+    # before counting them
+    await main.vote_buffer.flush()
+    while main.render_scheduler._tasks or main.background_tasks:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    interactions = len(jobs) or 1
+    edits = stats.rest_calls['message_edit'] - rest.get('message_edit', 0)
+    print(f'\n== {name}: {len(jobs)} interactions in {elapsed:.2f}s')
+    print(f'   DB ops/interaction: {(stats.db_ops - db_ops) / interactions:.2f}'
+          f'   message edits: {edits}')
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def report():
+    print('\n== Handler latency (ms)')
+    print(f'   {"path":<12}{"count":>8}{"p50":>10}{"p99":>10}{"max":>10}')
+    for path, values in stats.latencies.items():
+        print(f'   {path:<12}{len(values):>8}'
+              f'{percentile(values, 50) * 1000:>10.2f}'
+              f'{percentile(values, 99) * 1000:>10.2f}'
+              f'{max(values) * 1000:>10.2f}')
+
+    print('\n== Event loop')
+    print(f'   stalled {stats.stall_total * 1000:.1f}ms in total, '
+          f'longest stall {stats.stall_max * 1000:.1f}ms')
+
+    print('\n== Discord REST calls')
+    for name, count in sorted(stats.rest_calls.items()):
+        print(f'   {name:<22}{count:>8}')
+
+
+async def simulate():
+    rng = random.Random(args.seed)
+    await main.db.open()
+    await main.vote_buffer.recover()
+    count_db_ops()
+    fake_partial_messageable()
+    main.vote_buffer.start()
+    watcher = asyncio.create_task(watch_event_loop())
+
+    guilds = [FakeGuild() for _ in range(args.guilds)]
+    for guild in guilds:
+        await main.set_suggestion_channel(guild.id, guild.channel.id)
+        await main.set_reviewer_role(guild.id, guild.reviewer_role.id)
+
+    # Submissions
+    jobs = []
+    for n in range(args.suggestions):
+        guild = guilds[n % len(guilds)]
+        modal = main.SuggestionModal()
+        modal.title_input._value = f'Suggestion {n}'
+        # Distinct texts, so the duplicate check lets every one through
+        modal.description_input._value = ' '.join(
+            f'word{rng.randrange(5000)}' for _ in range(180))
+        modal.pros_input._value = 'It would be nice.'
+        modal.cons_input._value = 'Somebody has to build it.'
+        interaction = FakeInteraction(guild, FakeUser(rng.randrange(1, 10**6)))
+        jobs.append(('submit', modal.on_submit(interaction)))
+    await run_phase('submit', jobs)
+
+    messages = [(guild, message) for guild in guilds
+                for message in guild.channel.messages.values()]
+    hot = messages[0]
+
+    # Vote burst
+    jobs = []
+    for _ in range(args.votes):
+        guild, message = hot if rng.random() < args.hot else rng.choice(
+            messages)
+        user = FakeUser(rng.randrange(args.voters))
+        interaction = FakeInteraction(guild, user, message)
+        button = main.VoteButton(rng.choice(['upvote', 'downvote']),
+                                 message.suggestion_id)
+        jobs.append(('vote', button.callback(interaction)))
+    await run_phase('vote', jobs)
+
+    # Decisions
+    jobs = []
+    for guild, message in rng.sample(messages,
+                                     int(len(messages) * args.decide)):
+        reviewer = FakeUser(rng.randrange(1, 10**6), [guild.reviewer_role])
+        interaction = FakeInteraction(guild, reviewer)
+        command, path = rng.choice([(main.approve, 'approve'),
+                                    (main.reject, 'reject')])
+        jobs.append((path, command.callback(interaction,
+                                            message.suggestion_id,
+                                            'Benchmark decision', False)))
+    await run_phase('decide', jobs)
+
+    watcher.cancel()
+    await main.vote_buffer.close()
+    main.render_scheduler.close()
+    await main.db.close()
+
+
+# Votes layout
+TEXT_VOTE_STATE = '''SELECT v.vote_type, s.upvotes, s.downvotes
+                     FROM suggestions s
+                     LEFT JOIN votes v ON v.suggestion_id = s.suggestion_id AND v.user_id = ?
+                     WHERE s.suggestion_id = ?'''
+TEXT_TALLY = "SELECT COUNT(*) FROM votes WHERE suggestion_id = ? AND vote_type = 'upvote'"
+COMPACT_TALLY = '''SELECT COUNT(*) FROM votes
+                   WHERE suggestion_key = (SELECT suggestion_key FROM suggestions
+                                           WHERE suggestion_id = ?)
+                     AND vote = 1'''
+
+
+def build_text_votes(path, rng):
+    """A database at the last schema version with the text votes table."""
+    conn = sqlite3.connect(path)
+    version = main.MIGRATIONS.index(main.migrate_compact_votes)
+    for migration in main.MIGRATIONS[:version]:
+        migration(conn)
+    conn.execute(f'PRAGMA user_version = {version}')
+
+    suggestion_ids = [main.generate_suggestion_id()
+                      for _ in range(args.suggestions)]
+    conn.executemany(
+        '''INSERT INTO suggestions (suggestion_id, guild_id, user_id, title, description,
+                                  status, created_at)
+           VALUES (?, 1, 1, 'Title', 'Description', 'pending', '2026-01-01T00:00:00+00:00')''',
+        [(suggestion_id,) for suggestion_id in suggestion_ids])
+
+    # Snowflake-sized user IDs, as stored for real Discord users
+    voters = [rng.randrange(10**17, 1 << 62) for _ in range(args.voters)]
+    votes = {}
+    for _ in range(args.votes):
+        suggestion_id = (suggestion_ids[0] if rng.random() < args.hot
+                         else rng.choice(suggestion_ids))
+        votes[(suggestion_id, rng.choice(voters))] = rng.choice(
+            ['upvote', 'downvote'])
+    conn.executemany('INSERT INTO votes VALUES (?, ?, ?)',
+                     [(s_id, u_id, vote) for (s_id, u_id), vote in
+                      votes.items()])
+    conn.commit()
+    return conn, suggestion_ids, list(votes)
+
+
+def votes_bytes(conn):
+    """Bytes used by the votes table and its indexes, if dbstat is built in."""
+    try:
+        return conn.execute(
+            '''SELECT SUM(pgsize) FROM dbstat
+               WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = 'votes')'''
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def time_queries(conn, sql, params):
+    start = time.perf_counter()
+    for param in params:
+        conn.execute(sql, param).fetchall()
+    return (time.perf_counter() - start) / len(params)
+
+
+def compare_vote_layouts():
+    rng = random.Random(args.seed)
+    text_path = os.path.join(workdir, 'votes-text.db')
+    compact_path = os.path.join(workdir, 'votes-compact.db')
+
+    text, suggestion_ids, votes = build_text_votes(text_path, rng)
+    text.execute(f"VACUUM INTO '{compact_path}'")
+    text.execute('VACUUM')
+    compact = sqlite3.connect(compact_path)
+    main.migrate(compact)
+    compact.execute('VACUUM')
+
+    lookups = [(user_id, suggestion_id) for suggestion_id, user_id in
+               rng.sample(votes, min(len(votes), 20000))]
+    tallies = [(suggestion_ids[0],)] * 20
+    vote_state = main.get_vote_state.implementations['sqlite']
+
+    print(f'\n== Votes layout: {len(votes)} vote(s) on '
+          f'{len(suggestion_ids)} suggestion(s)')
+    print(f'   {"layout":<10}{"file MB":>10}{"votes MB":>10}'
+          f'{"lookup us":>12}{"hot tally ms":>14}')
+    for name, conn, lookup, tally_sql in [
+            ('text', text,
+             lambda user_id, s_id: text.execute(TEXT_VOTE_STATE,
+                                                (user_id, s_id)).fetchone(),
+             TEXT_TALLY),
+            ('compact', compact,
+             lambda user_id, s_id: vote_state(compact, s_id, user_id),
+             COMPACT_TALLY)]:
+        start = time.perf_counter()
+        for user_id, suggestion_id in lookups:
+            lookup(user_id, suggestion_id)
+        lookup_time = (time.perf_counter() - start) / len(lookups)
+        tally_time = time_queries(conn, tally_sql, tallies)
+
+        size = os.path.getsize(text_path if conn is text else compact_path)
+        table = votes_bytes(conn)
+        print(f'   {name:<10}{size / 1e6:>10.2f}'
+              f'{table / 1e6 if table else float("nan"):>10.2f}'
+              f'{lookup_time * 1e6:>12.2f}{tally_time * 1e3:>14.3f}')
+    text.close()
+    compact.close()
+
+
+def run():
+    if args.vote_layout:
+        compare_vote_layouts()
+        return
+    print(f'Simulating {args.guilds} guild(s), {args.suggestions} '
+          f'suggestion(s), {args.votes} vote(s) from {args.voters} voter(s); '
+          f'database in {workdir}')
+    asyncio.run(simulate())
+    report()
+
+
+if __name__ == '__main__':
+    try:
+        run()
+    finally:
+        if args.keep:
+            print(f'Kept {workdir}')
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -1,96 +1,894 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+import aiohttp
+import asyncio
+import argparse
+import csv
+import functools
+import gzip
+import hashlib
+import heapq
+import io
+from array import array
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager, contextmanager
+import json
+import math
+import operator
+import re
 import sqlite3
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
 import secrets
 import string
 import os
+import tempfile
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 DATABASE = os.getenv("DB_PATH")
-
-if not TOKEN:
-    raise ValueError("DISCORD_TOKEN not found in .env file")
+# A postgresql:// URL shared by several bot processes; replaces DB_PATH
+DATABASE_URL = os.getenv("DATABASE_URL")
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+# Must be local to each process
+VOTE_JOURNAL = os.getenv("VOTE_JOURNAL_PATH",
+                         f"{DATABASE or 'suggestions'}.votes-journal")
+# 0 disables write-behind buffering; each click then commits on its own
+VOTE_FLUSH_INTERVAL = float(os.getenv("VOTE_FLUSH_INTERVAL", "0.5"))
+VOTE_FLUSH_BATCH = int(os.getenv("VOTE_FLUSH_BATCH", "200"))
+SUGGESTION_CACHE_SIZE = int(os.getenv("SUGGESTION_CACHE_SIZE", "2048"))
+EMBED_EDIT_INTERVAL = float(os.getenv("EMBED_EDIT_INTERVAL", "2.0"))
+# Messages edited at once by /bulkdecide
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "4"))
+# Rate limits longer than this raise discord.RateLimited instead of sleeping
+RATELIMIT_TIMEOUT = float(os.getenv("RATELIMIT_TIMEOUT", "30"))
+# Serve Prometheus text metrics on this port (0 disables)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# Or dump them to a file every METRICS_DUMP_INTERVAL seconds
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH")
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))
+# Unset lets Discord recommend a shard count
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None
+# Comma-separated shards run by this process, e.g. "0,1" (default: all)
+SHARD_IDS = [int(shard_id) for shard_id in
+             os.getenv("SHARD_IDS", "").split(",") if shard_id.strip()] or None
+
+if not DATABASE and not DATABASE_URL:
+    raise ValueError("Set DB_PATH or DATABASE_URL in .env file")
+
+if SHARD_IDS and not SHARD_COUNT:
+    raise ValueError("SHARD_IDS requires SHARD_COUNT to be set")
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class SuggestionsBot(commands.AutoShardedBot):
+    async def setup_hook(self):
+        self.add_dynamic_items(VoteButton)
+        await db.open()
+        await vote_buffer.recover()
+        vote_buffer.start()
+        await metrics.start()
+
+    async def close(self):
+        await metrics.stop()
+        render_scheduler.close()
+        if background_tasks:
+            await asyncio.wait(background_tasks, timeout=10)
+        await vote_buffer.close()
+        await media_store.close()
+        await db.close()
+        await super().close()
+
+
+# Metrics
+class Metrics:
+    """Prometheus-style counters, gauges and latency histograms.
+
+    Exposed as plain text on METRICS_PORT and/or dumped to METRICS_DUMP_PATH.
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+               2.5, 5.0, 10.0)
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        # name -> {labels: value}
+        self._counters = defaultdict(lambda: defaultdict(float))
+        # name -> {labels: [bucket counts..., sum, count]}
+        self._histograms = defaultdict(dict)
+        # name -> (type, callable)
+        self._collected = {}
+        # Latest results of coroutine gauges
+        self._awaited = {}
+        self._server = None
+        self._dump_task = None
+
+    @staticmethod
+    def _labels(labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        self._counters[name][self._labels(labels)] += amount
+
+    def observe(self, name, seconds, **labels):
+        key = self._labels(labels)
+        series = self._histograms[name].get(key)
+        if series is None:
+            series = self._histograms[name][key] = [0] * (
+                    len(self.BUCKETS) + 2)
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                series[i] += 1
+        series[-2] += seconds
+        series[-1] += 1
+
+    @contextmanager
+    def time(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def gauge(self, name, func, label=None):
+        """Report ``func()`` as a gauge every time metrics are rendered.
+
+        ``func`` may be a coroutine function (e.g. a database count); those
+        are awaited by ``snapshot`` before rendering. With ``label``, ``func``
+        returns a ``{label value: value}`` dict, one series per entry.
+        """
+        self._collected[name] = ('gauge', func, label)
+
+    def counter(self, name, func, label=None):
+        """Report ``func()`` as a counter kept elsewhere (e.g. cache hits)."""
+        self._collected[name] = ('counter', func, label)
+
+    def _format(self, name, labels, value, extra=()):
+        pairs = [f'{k}="{v}"' for k, v in labels + tuple(extra)]
+        label_text = '{' + ','.join(pairs) + '}' if pairs else ''
+        return f'{self.prefix}_{name}{label_text} {value:g}'
+
+    def render(self):
+        lines = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f'# TYPE {self.prefix}_{name} counter')
+            for labels, value in series.items():
+                lines.append(self._format(name, labels, value))
+
+        for name, (kind, func, label) in sorted(self._collected.items()):
+            if asyncio.iscoroutinefunction(func):
+                value = self._awaited.get(name)
+                if value is None:
+                    continue
+            else:
+                try:
+                    value = func()
+                except Exception:
+                    continue
+            lines.append(f'# TYPE {self.prefix}_{name} {kind}')
+            if label:
+                for label_value, series_value in sorted(value.items()):
+                    lines.append(self._format(name, ((label, label_value),),
+                                              series_value))
+            else:
+                lines.append(self._format(name, (), value))
+
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f'# TYPE {self.prefix}_{name} histogram')
+            for labels, values in series.items():
+                for bound, count in zip(self.BUCKETS, values):
+                    lines.append(self._format(f'{name}_bucket', labels, count,
+                                              [('le', f'{bound:g}')]))
+                lines.append(self._format(f'{name}_bucket', labels,
+                                          values[-1], [('le', '+Inf')]))
+                lines.append(self._format(f'{name}_sum', labels, values[-2]))
+                lines.append(self._format(f'{name}_count', labels,
+                                          values[-1]))
+        return '\n'.join(lines) + '\n'
+
+    async def snapshot(self):
+        """Refresh coroutine gauges and render the metrics text."""
+        for name, (_, func, _) in self._collected.items():
+            if asyncio.iscoroutinefunction(func):
+                try:
+                    self._awaited[name] = await func()
+                except Exception:
+                    self._awaited.pop(name, None)
+        return self.render()
+
+    async def _handle_scrape(self, reader, writer):
+        try:
+            # Every path serves the metrics; the request itself is ignored
+            await reader.readuntil(b'\r\n\r\n')
+            body = (await self.snapshot()).encode()
+            writer.write(b'HTTP/1.1 200 OK\r\n'
+                         b'Content-Type: text/plain; version=0.0.4\r\n'
+                         b'Content-Length: ' + str(len(body)).encode() +
+                         b'\r\nConnection: close\r\n\r\n' + body)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dump(self):
+        while True:
+            await asyncio.sleep(METRICS_DUMP_INTERVAL)
+            text = await self.snapshot()
+            try:
+                await asyncio.to_thread(self._write_dump, text)
+            except OSError as e:
+                print(f'Error writing metrics to {METRICS_DUMP_PATH}: {e}')
+
+    @staticmethod
+    def _write_dump(text):
+        tmp_path = f'{METRICS_DUMP_PATH}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, METRICS_DUMP_PATH)
+
+    async def start(self):
+        if METRICS_PORT and not self._server:
+            self._server = await asyncio.start_server(
+                self._handle_scrape, METRICS_HOST, METRICS_PORT)
+            print(f'Serving metrics on {METRICS_HOST}:{METRICS_PORT}')
+        if METRICS_DUMP_PATH and not self._dump_task:
+            self._dump_task = asyncio.create_task(self._dump())
+
+    async def stop(self):
+        if self._dump_task:
+            self._dump_task.cancel()
+            self._dump_task = None
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+metrics = Metrics('suggestions_bot')
+
+
+def shard_for(guild_id):
+    """The shard a guild's events arrive on, per Discord's sharding formula."""
+    if not guild_id or not bot.shard_count:
+        return 0
+    return (guild_id >> 22) % bot.shard_count
+
+
+def instrumented(kind):
+    """Time an interaction handler and count its calls and failures."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            metrics.inc('interactions_total', kind=kind, handler=func.__name__)
+            interaction = next((arg for arg in args
+                                if isinstance(arg, discord.Interaction)), None)
+            if interaction:
+                metrics.inc('shard_interactions_total',
+                            shard=shard_for(interaction.guild_id))
+            try:
+                with metrics.time('handler_seconds', kind=kind,
+                                  handler=func.__name__):
+                    return await func(*args, **kwargs)
+            except Exception:
+                metrics.inc('errors_total', where=func.__name__)
+                raise
+
+        return wrapper
+
+    return decorator
+
+
+async def on_discord_request_end(session, context, params):
+    status = params.response.status
+    metrics.inc('discord_responses_total', status=status)
+    if status == 429:
+        metrics.inc('discord_ratelimits_total')
+
+
+discord_trace = aiohttp.TraceConfig()
+discord_trace.on_request_end.append(on_discord_request_end)
+
+bot = SuggestionsBot(command_prefix="!", intents=intents,
+                     shard_count=SHARD_COUNT, shard_ids=SHARD_IDS,
+                     max_ratelimit_timeout=RATELIMIT_TIMEOUT,
+                     http_trace=discord_trace)
+
+
+# Storage
+class SQLiteStorage:
+    """Long-lived SQLite connection owned by a single worker thread.
+
+    Every query runs on that thread, so interaction handlers await the
+    result instead of blocking the event loop on disk I/O.
+    """
+
+    dialect = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix='sqlite',
+                                            initializer=self._connect)
+
+    def _connect(self):
+        # cached_statements keeps every helper's statement prepared for
+        # the lifetime of the connection
+        conn = sqlite3.connect(self.path, cached_statements=256)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn = conn
+
+    def _invoke(self, func, *args):
+        return func(self._conn, *args)
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._invoke, func,
+                                          *args)
+
+    async def open(self):
+        await self._call(migrate)
+
+    async def run(self, helper, *args):
+        """Run a db_helper on the database thread without blocking the loop."""
+        return await self._call(helper.implementations['sqlite'], *args)
+
+    async def batches(self, sql, params, size):
+        """Yield the rows of a query ``size`` at a time.
+
+        Reads through its own read-only connection, so a long export streams
+        from a WAL snapshot without holding up the database thread.
+        """
+        uri = f'{Path(self.path).resolve().as_uri()}?mode=ro'
+        conn = await asyncio.to_thread(sqlite3.connect, uri, uri=True,
+                                       check_same_thread=False)
+        try:
+            cursor = await asyncio.to_thread(conn.execute, sql, params)
+            while rows := await asyncio.to_thread(cursor.fetchmany, size):
+                yield rows
+        finally:
+            conn.close()
+
+    async def close(self):
+        if self._conn is not None:
+            await self._call(lambda conn: conn.close())
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+
+class PostgresStorage:
+    """asyncpg connection pool on a database shared by several bot processes.
+
+    Each process must run a disjoint set of shards (see SHARD_IDS), so every
+    guild is served by exactly one process and the in-memory caches stay
+    authoritative; the database only has to keep concurrent writes atomic.
+    """
+
+    dialect = 'postgres'
+
+    def __init__(self, url):
+        self.url = url
+        self._pool = None
+
+    async def open(self):
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError(
+                'DATABASE_URL needs the asyncpg package (pip install asyncpg)'
+            ) from None
+
+        self._pool = await asyncpg.create_pool(
+            self.url, min_size=PG_POOL_MIN_SIZE, max_size=PG_POOL_MAX_SIZE)
+        async with self._pool.acquire() as conn:
+            await migrate_postgres(conn)
+
+    async def run(self, helper, *args):
+        """Run a db_helper on a pooled connection."""
+        impl = helper.implementations.get('postgres')
+        if impl is None:
+            raise NotImplementedError(
+                f'{helper.__name__} has no PostgreSQL implementation')
+        async with self._pool.acquire() as conn:
+            return await impl(conn, *args)
+
+    async def batches(self, sql, params, size):
+        """Yield the rows of a query ``size`` at a time from a server-side cursor."""
+        async with self._pool.acquire() as conn:
+            async with conn.transaction(isolation='repeatable_read',
+                                        readonly=True):
+                cursor = await conn.cursor(sql, *params)
+                while rows := await cursor.fetch(size):
+                    yield [tuple(row) for row in rows]
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+db = PostgresStorage(DATABASE_URL) if DATABASE_URL else SQLiteStorage(DATABASE)
+
+
+def db_helper(func):
+    """Expose ``func(conn, ...)`` as a coroutine run by the storage backend.
+
+    ``func`` is the SQLite implementation. The PostgreSQL one is an async
+    function registered with ``@<helper>.postgres``.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args):
+        with metrics.time('db_query_seconds', query=func.__name__):
+            return await db.run(wrapper, *args)
+
+    def postgres(impl):
+        wrapper.implementations['postgres'] = impl
+        return wrapper
+
+    wrapper.implementations = {'sqlite': func}
+    wrapper.postgres = postgres
+    return wrapper
+
+
+def rows_affected(status):
+    """The row count of an asyncpg command status such as ``'UPDATE 3'``."""
+    return int(status.rsplit(' ', 1)[-1])
 
 
 # Database setup
-def init_db():
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
+def table_columns(conn, table):
+    return [column[1] for column in conn.execute(f'PRAGMA table_info({table})')]
+
 
+def migrate_base_schema(conn):
     # Guild settings table
-    c.execute('''CREATE TABLE IF NOT EXISTS guild_settings
-                 (
-                     guild_id INTEGER PRIMARY KEY,
-                     suggestion_channel_id INTEGER,
-                     reviewer_role_id INTEGER,
-                     blocked_role_id INTEGER
-                 )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS guild_settings
+                    (
+                        guild_id INTEGER PRIMARY KEY,
+                        suggestion_channel_id INTEGER,
+                        reviewer_role_id INTEGER,
+                        blocked_role_id INTEGER
+                    )''')
 
     # Suggestions table
-    c.execute('''CREATE TABLE IF NOT EXISTS suggestions
-                 (
-                     suggestion_id TEXT PRIMARY KEY,
-                     guild_id INTEGER,
-                     user_id INTEGER,
-                     message_id INTEGER,
-                     thread_id INTEGER,
-                     title TEXT,
-                     description TEXT,
-                     pros TEXT,
-                     cons TEXT,
-                     image_url TEXT,
-                     status TEXT DEFAULT 'pending',
-                     created_at TEXT,
-                     decision_reason TEXT,
-                     decided_anonymously INTEGER DEFAULT 0
-                 )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS suggestions
+                    (
+                        suggestion_id TEXT PRIMARY KEY,
+                        guild_id INTEGER,
+                        user_id INTEGER,
+                        message_id INTEGER,
+                        thread_id INTEGER,
+                        title TEXT,
+                        description TEXT,
+                        pros TEXT,
+                        cons TEXT,
+                        image_url TEXT,
+                        status TEXT DEFAULT 'pending',
+                        created_at TEXT,
+                        decision_reason TEXT,
+                        decided_anonymously INTEGER DEFAULT 0
+                    )''')
 
     # Votes table
-    c.execute('''CREATE TABLE IF NOT EXISTS votes
-                 (
-                     suggestion_id TEXT,
-                     user_id INTEGER,
-                     vote_type TEXT,
-                     PRIMARY KEY (suggestion_id, user_id)
-                 )''')
-
-    # Migrate existing tables
-    try:
-        # Check if blocked_role_id column exists in guild_settings
-        c.execute("PRAGMA table_info(guild_settings)")
-        columns = [column[1] for column in c.fetchall()]
-        if 'blocked_role_id' not in columns:
-            c.execute('ALTER TABLE guild_settings ADD COLUMN blocked_role_id INTEGER')
-    except Exception:
-        pass
-
-    try:
-        # Check if thread_id column exists in suggestions
-        c.execute("PRAGMA table_info(suggestions)")
-        columns = [column[1] for column in c.fetchall()]
-        if 'thread_id' not in columns:
-            c.execute('ALTER TABLE suggestions ADD COLUMN thread_id INTEGER')
-        if 'decided_anonymously' not in columns:
-            c.execute('ALTER TABLE suggestions ADD COLUMN decided_anonymously INTEGER DEFAULT 0')
-    except Exception:
-        pass
-
-    conn.commit()
-    conn.close()
-
+    conn.execute('''CREATE TABLE IF NOT EXISTS votes
+                    (
+                        suggestion_id TEXT,
+                        user_id INTEGER,
+                        vote_type TEXT,
+                        PRIMARY KEY (suggestion_id, user_id)
+                    )''')
+
+    # Columns added before migrations were versioned
+    if 'blocked_role_id' not in table_columns(conn, 'guild_settings'):
+        conn.execute('ALTER TABLE guild_settings ADD COLUMN blocked_role_id INTEGER')
+
+    columns = table_columns(conn, 'suggestions')
+    if 'thread_id' not in columns:
+        conn.execute('ALTER TABLE suggestions ADD COLUMN thread_id INTEGER')
+    if 'decided_anonymously' not in columns:
+        conn.execute('ALTER TABLE suggestions ADD COLUMN decided_anonymously INTEGER DEFAULT 0')
+
+
+def migrate_vote_tallies(conn):
+    if 'upvotes' not in table_columns(conn, 'suggestions'):
+        conn.execute('ALTER TABLE suggestions ADD COLUMN upvotes INTEGER DEFAULT 0')
+        conn.execute('ALTER TABLE suggestions ADD COLUMN downvotes INTEGER DEFAULT 0')
+
+    conn.execute('''UPDATE suggestions
+                    SET upvotes   = (SELECT COUNT(*) FROM votes v
+                                     WHERE v.suggestion_id = suggestions.suggestion_id
+                                       AND v.vote_type = 'upvote'),
+                        downvotes = (SELECT COUNT(*) FROM votes v
+                                     WHERE v.suggestion_id = suggestions.suggestion_id
+                                       AND v.vote_type = 'downvote')''')
+
+    # Keep the materialized tallies in step with the votes table
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS votes_tally_insert
+                    AFTER INSERT ON votes
+                    BEGIN
+                        UPDATE suggestions
+                        SET upvotes = upvotes + (NEW.vote_type = 'upvote'),
+                            downvotes = downvotes + (NEW.vote_type = 'downvote')
+                        WHERE suggestion_id = NEW.suggestion_id;
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS votes_tally_delete
+                    AFTER DELETE ON votes
+                    BEGIN
+                        UPDATE suggestions
+                        SET upvotes = upvotes - (OLD.vote_type = 'upvote'),
+                            downvotes = downvotes - (OLD.vote_type = 'downvote')
+                        WHERE suggestion_id = OLD.suggestion_id;
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS votes_tally_update
+                    AFTER UPDATE OF vote_type ON votes
+                    BEGIN
+                        UPDATE suggestions
+                        SET upvotes = upvotes - (OLD.vote_type = 'upvote')
+                                              + (NEW.vote_type = 'upvote'),
+                            downvotes = downvotes - (OLD.vote_type = 'downvote')
+                                                  + (NEW.vote_type = 'downvote')
+                        WHERE suggestion_id = OLD.suggestion_id;
+                    END''')
+
+
+def migrate_indexes(conn):
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_suggestions_guild_status
+                    ON suggestions (guild_id, status, created_at)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_suggestions_status
+                    ON suggestions (status, created_at)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_votes_user
+                    ON votes (user_id)''')
+
+
+def migrate_render_state(conn):
+    # Everything render_suggestion_embed needs, so embeds can be rebuilt
+    # from the database instead of patched from a fetched message
+    columns = table_columns(conn, 'suggestions')
+    for column, definition in [('channel_id', 'INTEGER'),
+                               ('author_name', 'TEXT'),
+                               ('author_icon_url', 'TEXT'),
+                               ('decided_by', 'INTEGER'),
+                               ('version', 'INTEGER DEFAULT 0')]:
+        if column not in columns:
+            conn.execute(
+                f'ALTER TABLE suggestions ADD COLUMN {column} {definition}')
+
+
+def migrate_suggestion_key(conn):
+    # Without an INTEGER PRIMARY KEY, VACUUM may renumber the implicit rowid,
+    # which would silently detach the search index below. Rebuild the table
+    # with suggestion_key aliasing rowid; existing rowids are kept.
+    conn.execute('''CREATE TABLE suggestions_new
+                    (
+                        suggestion_key INTEGER PRIMARY KEY,
+                        suggestion_id TEXT NOT NULL UNIQUE,
+                        guild_id INTEGER,
+                        user_id INTEGER,
+                        message_id INTEGER,
+                        thread_id INTEGER,
+                        title TEXT,
+                        description TEXT,
+                        pros TEXT,
+                        cons TEXT,
+                        image_url TEXT,
+                        status TEXT DEFAULT 'pending',
+                        created_at TEXT,
+                        decision_reason TEXT,
+                        decided_anonymously INTEGER DEFAULT 0,
+                        upvotes INTEGER DEFAULT 0,
+                        downvotes INTEGER DEFAULT 0,
+                        channel_id INTEGER,
+                        author_name TEXT,
+                        author_icon_url TEXT,
+                        decided_by INTEGER,
+                        version INTEGER DEFAULT 0
+                    )''')
+    columns = ', '.join(column for column in table_columns(conn, 'suggestions_new')
+                        if column != 'suggestion_key')
+    conn.execute(f'''INSERT INTO suggestions_new (suggestion_key, {columns})
+                     SELECT rowid, {columns} FROM suggestions''')
+    conn.execute('DROP TABLE suggestions')
+    # The votes triggers name suggestions; the modern RENAME refuses to run
+    # while they point at a table that is momentarily missing
+    conn.execute('PRAGMA legacy_alter_table = ON')
+    conn.execute('ALTER TABLE suggestions_new RENAME TO suggestions')
+    conn.execute('PRAGMA legacy_alter_table = OFF')
+    migrate_indexes(conn)
+
+
+def migrate_search_index(conn):
+    # External-content FTS5 index: the text lives only in suggestions, the
+    # index stores just the terms and is addressed by suggestion_key
+    conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS suggestions_fts USING fts5
+                    (
+                        title, description, pros, cons,
+                        content='suggestions', content_rowid='suggestion_key',
+                        tokenize='porter unicode61'
+                    )''')
+    conn.execute("INSERT INTO suggestions_fts(suggestions_fts) VALUES ('rebuild')")
+
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS suggestions_fts_insert
+                    AFTER INSERT ON suggestions
+                    BEGIN
+                        INSERT INTO suggestions_fts (rowid, title, description, pros, cons)
+                        VALUES (NEW.suggestion_key, NEW.title, NEW.description, NEW.pros, NEW.cons);
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS suggestions_fts_delete
+                    AFTER DELETE ON suggestions
+                    BEGIN
+                        INSERT INTO suggestions_fts (suggestions_fts, rowid, title, description, pros, cons)
+                        VALUES ('delete', OLD.suggestion_key, OLD.title, OLD.description, OLD.pros, OLD.cons);
+                    END''')
+    # Only on text changes: votes and decisions update suggestions constantly
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS suggestions_fts_update
+                    AFTER UPDATE OF title, description, pros, cons ON suggestions
+                    BEGIN
+                        INSERT INTO suggestions_fts (suggestions_fts, rowid, title, description, pros, cons)
+                        VALUES ('delete', OLD.suggestion_key, OLD.title, OLD.description, OLD.pros, OLD.cons);
+                        INSERT INTO suggestions_fts (rowid, title, description, pros, cons)
+                        VALUES (NEW.suggestion_key, NEW.title, NEW.description, NEW.pros, NEW.cons);
+                    END''')
+
+
+def migrate_reconcile_state(conn):
+    # What each message and thread were last brought up to date with, so
+    # reconcile_guild only touches suggestions that drifted while offline
+    columns = table_columns(conn, 'suggestions')
+    for column, definition in [('rendered_hash', 'TEXT'),
+                               ('thread_locked', 'INTEGER DEFAULT 0')]:
+        if column not in columns:
+            conn.execute(
+                f'ALTER TABLE suggestions ADD COLUMN {column} {definition}')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_suggestions_guild_id
+                    ON suggestions (guild_id, suggestion_id)''')
+
+
+def migrate_rate_limits(conn):
+    columns = table_columns(conn, 'guild_settings')
+    for column in ('vote_rate_limit', 'suggestion_vote_rate_limit',
+                   'submission_rate_limit'):
+        if column not in columns:
+            conn.execute(
+                f'ALTER TABLE guild_settings ADD COLUMN {column} INTEGER')
+
+
+def migrate_compact_votes(conn):
+    # A vote becomes (suggestion_key, user_id, 0 or 1) instead of repeating
+    # the text ID and 'upvote'/'downvote'. SQLite stores 0 and 1 in the
+    # record header alone, and WITHOUT ROWID clusters each suggestion's
+    # voters in the primary key b-tree. Votes for deleted suggestions go.
+    conn.execute('''CREATE TABLE votes_new
+                    (
+                        suggestion_key INTEGER NOT NULL,
+                        user_id INTEGER NOT NULL,
+                        vote INTEGER NOT NULL,
+                        PRIMARY KEY (suggestion_key, user_id)
+                    ) WITHOUT ROWID''')
+    conn.execute('''INSERT INTO votes_new
+                    SELECT s.suggestion_key, v.user_id, v.vote_type = 'upvote'
+                    FROM votes v
+                    JOIN suggestions s ON s.suggestion_id = v.suggestion_id
+                    WHERE v.vote_type IN ('upvote', 'downvote')
+                    ORDER BY 1, 2''')
+    # Also drops the old tally triggers and idx_votes_user
+    conn.execute('DROP TABLE votes')
+    conn.execute('ALTER TABLE votes_new RENAME TO votes')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_votes_user
+                    ON votes (user_id)''')
+
+    conn.execute('''CREATE TRIGGER votes_tally_insert
+                    AFTER INSERT ON votes
+                    BEGIN
+                        UPDATE suggestions
+                        SET upvotes = upvotes + NEW.vote,
+                            downvotes = downvotes + 1 - NEW.vote
+                        WHERE suggestion_key = NEW.suggestion_key;
+                    END''')
+    conn.execute('''CREATE TRIGGER votes_tally_delete
+                    AFTER DELETE ON votes
+                    BEGIN
+                        UPDATE suggestions
+                        SET upvotes = upvotes - OLD.vote,
+                            downvotes = downvotes - 1 + OLD.vote
+                        WHERE suggestion_key = OLD.suggestion_key;
+                    END''')
+    conn.execute('''CREATE TRIGGER votes_tally_update
+                    AFTER UPDATE OF vote ON votes
+                    BEGIN
+                        UPDATE suggestions
+                        SET upvotes = upvotes - OLD.vote + NEW.vote,
+                            downvotes = downvotes + OLD.vote - NEW.vote
+                        WHERE suggestion_key = OLD.suggestion_key;
+                    END''')
+
+
+# Schema version N is reached by applying MIGRATIONS[N - 1]. Append new
+# migrations to the end; never edit or reorder ones that have shipped.
+MIGRATIONS = [
+    migrate_base_schema,
+    migrate_vote_tallies,
+    migrate_indexes,
+    migrate_render_state,
+    migrate_suggestion_key,
+    migrate_search_index,
+    migrate_reconcile_state,
+    migrate_rate_limits,
+    migrate_compact_votes,
+]
+
+
+def migrate(conn):
+    """Bring the schema up to date, tracking progress in PRAGMA user_version.
+
+    Each migration runs in its own transaction together with its version
+    bump, so an interrupted upgrade resumes where it stopped.
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:],
+                                       start=version + 1):
+        conn.execute('BEGIN')
+        try:
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {number}')
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        print(f'Migrated database to schema version {number}')
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+async def postgres_base_schema(conn):
+    # The SQLite schema as of MIGRATIONS[:4]; created_at stays ISO 8601 text
+    # so both backends compare and parse it the same way
+    await conn.execute('''CREATE TABLE IF NOT EXISTS guild_settings
+                          (
+                              guild_id BIGINT PRIMARY KEY,
+                              suggestion_channel_id BIGINT,
+                              reviewer_role_id BIGINT,
+                              blocked_role_id BIGINT
+                          )''')
+    await conn.execute('''CREATE TABLE IF NOT EXISTS suggestions
+                          (
+                              suggestion_id TEXT PRIMARY KEY,
+                              guild_id BIGINT,
+                              user_id BIGINT,
+                              message_id BIGINT,
+                              thread_id BIGINT,
+                              title TEXT,
+                              description TEXT,
+                              pros TEXT,
+                              cons TEXT,
+                              image_url TEXT,
+                              status TEXT DEFAULT 'pending',
+                              created_at TEXT,
+                              decision_reason TEXT,
+                              decided_anonymously INTEGER DEFAULT 0,
+                              upvotes INTEGER DEFAULT 0,
+                              downvotes INTEGER DEFAULT 0,
+                              channel_id BIGINT,
+                              author_name TEXT,
+                              author_icon_url TEXT,
+                              decided_by BIGINT,
+                              version INTEGER DEFAULT 0
+                          )''')
+    await conn.execute('''CREATE TABLE IF NOT EXISTS votes
+                          (
+                              suggestion_id TEXT,
+                              user_id BIGINT,
+                              vote_type TEXT,
+                              PRIMARY KEY (suggestion_id, user_id)
+                          )''')
+
+    # Same tallies as the SQLite triggers. The UPDATE takes the suggestion's
+    # row lock, which serializes concurrent votes on it across processes.
+    await conn.execute('''CREATE OR REPLACE FUNCTION votes_tally() RETURNS trigger AS $$
+                          BEGIN
+                              IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                                  UPDATE suggestions
+                                  SET upvotes = upvotes - (OLD.vote_type = 'upvote')::int,
+                                      downvotes = downvotes - (OLD.vote_type = 'downvote')::int
+                                  WHERE suggestion_id = OLD.suggestion_id;
+                              END IF;
+                              IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                                  UPDATE suggestions
+                                  SET upvotes = upvotes + (NEW.vote_type = 'upvote')::int,
+                                      downvotes = downvotes + (NEW.vote_type = 'downvote')::int
+                                  WHERE suggestion_id = NEW.suggestion_id;
+                              END IF;
+                              RETURN NULL;
+                          END
+                          $$ LANGUAGE plpgsql''')
+    await conn.execute('DROP TRIGGER IF EXISTS votes_tally ON votes')
+    await conn.execute('''CREATE TRIGGER votes_tally
+                          AFTER INSERT OR DELETE OR UPDATE OF vote_type ON votes
+                          FOR EACH ROW EXECUTE FUNCTION votes_tally()''')
+
+    await conn.execute('''CREATE INDEX IF NOT EXISTS idx_suggestions_guild_status
+                          ON suggestions (guild_id, status, created_at)''')
+    await conn.execute('''CREATE INDEX IF NOT EXISTS idx_suggestions_status
+                          ON suggestions (status, created_at)''')
+    await conn.execute('''CREATE INDEX IF NOT EXISTS idx_votes_user
+                          ON votes (user_id)''')
+
+
+async def postgres_search_index(conn):
+    # Titles rank above body text, like the bm25 weights in search_suggestions
+    await conn.execute('''ALTER TABLE suggestions ADD COLUMN IF NOT EXISTS search tsvector
+                          GENERATED ALWAYS AS (
+                              setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                              setweight(to_tsvector('english', coalesce(description, '') || ' ' ||
+                                                               coalesce(pros, '') || ' ' ||
+                                                               coalesce(cons, '')), 'B')
+                          ) STORED''')
+    await conn.execute('''CREATE INDEX IF NOT EXISTS idx_suggestions_search
+                          ON suggestions USING GIN (search)''')
+
+
+async def postgres_reconcile_state(conn):
+    await conn.execute('''ALTER TABLE suggestions
+                          ADD COLUMN IF NOT EXISTS rendered_hash TEXT,
+                          ADD COLUMN IF NOT EXISTS thread_locked INTEGER DEFAULT 0''')
+    await conn.execute('''CREATE INDEX IF NOT EXISTS idx_suggestions_guild_id
+                          ON suggestions (guild_id, suggestion_id)''')
+
+
+async def postgres_rate_limits(conn):
+    await conn.execute('''ALTER TABLE guild_settings
+                          ADD COLUMN IF NOT EXISTS vote_rate_limit INTEGER,
+                          ADD COLUMN IF NOT EXISTS suggestion_vote_rate_limit INTEGER,
+                          ADD COLUMN IF NOT EXISTS submission_rate_limit INTEGER''')
+
+
+# Versioned like MIGRATIONS, but in a schema_version table
+POSTGRES_MIGRATIONS = [
+    postgres_base_schema,
+    postgres_search_index,
+    postgres_reconcile_state,
+    postgres_rate_limits,
+]
+
+
+async def migrate_postgres(conn):
+    """Bring a PostgreSQL schema up to date.
+
+    Processes starting together serialize on an advisory lock, so only the
+    first one applies pending migrations.
+    """
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock(hashtext('suggestions_migrate'))")
+        await conn.execute(
+            'CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)')
+        version = await conn.fetchval('SELECT version FROM schema_version')
+        if version is None:
+            await conn.execute('INSERT INTO schema_version VALUES (0)')
+            version = 0
+
+        for number, migration in enumerate(POSTGRES_MIGRATIONS[version:],
+                                           start=version + 1):
+            await migration(conn)
+            await conn.execute('UPDATE schema_version SET version = $1',
+                               number)
+            print(f'Migrated database to schema version {number}')
+            version = number
+    return version
 
-init_db()
 
 
 # Generate random suggestion ID
@@ -101,136 +899,1767 @@ def generate_suggestion_id():
 
 
 # Database helpers
-def get_guild_settings(guild_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        'SELECT suggestion_channel_id, reviewer_role_id, blocked_role_id FROM guild_settings WHERE guild_id = ?',
+class GuildSettings(NamedTuple):
+    suggestion_channel_id: Optional[int]
+    reviewer_role_id: Optional[int]
+    blocked_role_id: Optional[int]
+    # None falls back to the RATE_LIMITS default; 0 turns the limit off
+    vote_rate_limit: Optional[int] = None
+    suggestion_vote_rate_limit: Optional[int] = None
+    submission_rate_limit: Optional[int] = None
+
+
+SETTINGS_COLUMNS = ', '.join(GuildSettings._fields)
+
+
+@db_helper
+def load_guild_settings(conn, guild_ids):
+    c = conn.execute(
+        f'''SELECT guild_id, {SETTINGS_COLUMNS} FROM guild_settings
+            WHERE guild_id IN (SELECT value FROM json_each(?))''',
+        (json.dumps(guild_ids),))
+    return {row[0]: GuildSettings(*row[1:]) for row in c.fetchall()}
+
+
+@load_guild_settings.postgres
+async def load_guild_settings(conn, guild_ids):
+    rows = await conn.fetch(
+        f'''SELECT guild_id, {SETTINGS_COLUMNS} FROM guild_settings
+            WHERE guild_id = ANY($1::bigint[])''',
+        guild_ids)
+    return {row[0]: GuildSettings(*tuple(row)[1:]) for row in rows}
+
+
+@db_helper
+def fetch_guild_settings(conn, guild_id):
+    c = conn.execute(
+        f'SELECT {SETTINGS_COLUMNS} FROM guild_settings WHERE guild_id = ?',
         (guild_id,))
     result = c.fetchone()
-    conn.close()
-    return result
-
-
-def set_suggestion_channel(guild_id, channel_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        '''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id) 
-           VALUES (?, ?, NULL, NULL)
-           ON CONFLICT(guild_id) DO UPDATE SET suggestion_channel_id = ?''',
-        (guild_id, channel_id, channel_id))
-    conn.commit()
-    conn.close()
-
-
-def set_reviewer_role(guild_id, role_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        '''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id) 
-           VALUES (?, NULL, ?, NULL)
-           ON CONFLICT(guild_id) DO UPDATE SET reviewer_role_id = ?''',
-        (guild_id, role_id, role_id))
-    conn.commit()
-    conn.close()
-
-
-def set_blocked_role(guild_id, role_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        '''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id) 
-           VALUES (?, NULL, NULL, ?)
-           ON CONFLICT(guild_id) DO UPDATE SET blocked_role_id = ?''',
-        (guild_id, role_id, role_id))
-    conn.commit()
-    conn.close()
-
-
-def save_suggestion(suggestion_id, guild_id, user_id, message_id, thread_id,
-                    title,
-                    description, pros, cons, image_url):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    created_at = datetime.now(timezone.utc).isoformat()
-    c.execute(
-        'INSERT INTO suggestions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
-        (suggestion_id, guild_id, user_id, message_id, thread_id, title,
-         description, pros,
-         cons, image_url, 'pending', created_at, None, 0))
-    conn.commit()
-    conn.close()
-
-
-def get_suggestion(suggestion_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute('SELECT * FROM suggestions WHERE suggestion_id = ?',
-              (suggestion_id,))
+    return GuildSettings(*result) if result else None
+
+
+@fetch_guild_settings.postgres
+async def fetch_guild_settings(conn, guild_id):
+    result = await conn.fetchrow(
+        f'SELECT {SETTINGS_COLUMNS} FROM guild_settings WHERE guild_id = $1',
+        guild_id)
+    return GuildSettings(*result) if result else None
+
+
+@db_helper
+def store_suggestion_channel(conn, guild_id, channel_id):
+    with conn:
+        c = conn.execute(
+            f'''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id) 
+                VALUES (?, ?, NULL, NULL)
+                ON CONFLICT(guild_id) DO UPDATE SET suggestion_channel_id = ?
+                RETURNING {SETTINGS_COLUMNS}''',
+            (guild_id, channel_id, channel_id))
+        return GuildSettings(*c.fetchone())
+
+
+@store_suggestion_channel.postgres
+async def store_suggestion_channel(conn, guild_id, channel_id):
+    result = await conn.fetchrow(
+        f'''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id)
+            VALUES ($1, $2, NULL, NULL)
+            ON CONFLICT(guild_id) DO UPDATE SET suggestion_channel_id = $2
+            RETURNING {SETTINGS_COLUMNS}''',
+        guild_id, channel_id)
+    return GuildSettings(*result)
+
+
+@db_helper
+def store_reviewer_role(conn, guild_id, role_id):
+    with conn:
+        c = conn.execute(
+            f'''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id) 
+                VALUES (?, NULL, ?, NULL)
+                ON CONFLICT(guild_id) DO UPDATE SET reviewer_role_id = ?
+                RETURNING {SETTINGS_COLUMNS}''',
+            (guild_id, role_id, role_id))
+        return GuildSettings(*c.fetchone())
+
+
+@store_reviewer_role.postgres
+async def store_reviewer_role(conn, guild_id, role_id):
+    result = await conn.fetchrow(
+        f'''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id)
+            VALUES ($1, NULL, $2, NULL)
+            ON CONFLICT(guild_id) DO UPDATE SET reviewer_role_id = $2
+            RETURNING {SETTINGS_COLUMNS}''',
+        guild_id, role_id)
+    return GuildSettings(*result)
+
+
+@db_helper
+def store_blocked_role(conn, guild_id, role_id):
+    with conn:
+        c = conn.execute(
+            f'''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id) 
+                VALUES (?, NULL, NULL, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET blocked_role_id = ?
+                RETURNING {SETTINGS_COLUMNS}''',
+            (guild_id, role_id, role_id))
+        return GuildSettings(*c.fetchone())
+
+
+@store_blocked_role.postgres
+async def store_blocked_role(conn, guild_id, role_id):
+    result = await conn.fetchrow(
+        f'''INSERT INTO guild_settings (guild_id, suggestion_channel_id, reviewer_role_id, blocked_role_id)
+            VALUES ($1, NULL, NULL, $2)
+            ON CONFLICT(guild_id) DO UPDATE SET blocked_role_id = $2
+            RETURNING {SETTINGS_COLUMNS}''',
+        guild_id, role_id)
+    return GuildSettings(*result)
+
+
+@db_helper
+def store_rate_limit(conn, guild_id, limit, rate):
+    """Set one of the rate limit columns; ``rate`` None restores the default."""
+    if limit not in RATE_LIMITS:
+        raise ValueError(f'Unknown rate limit {limit!r}')
+    with conn:
+        c = conn.execute(
+            f'''INSERT INTO guild_settings (guild_id, {limit}) VALUES (?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET {limit} = excluded.{limit}
+                RETURNING {SETTINGS_COLUMNS}''',
+            (guild_id, rate))
+        return GuildSettings(*c.fetchone())
+
+
+@store_rate_limit.postgres
+async def store_rate_limit(conn, guild_id, limit, rate):
+    if limit not in RATE_LIMITS:
+        raise ValueError(f'Unknown rate limit {limit!r}')
+    result = await conn.fetchrow(
+        f'''INSERT INTO guild_settings (guild_id, {limit}) VALUES ($1, $2)
+            ON CONFLICT(guild_id) DO UPDATE SET {limit} = excluded.{limit}
+            RETURNING {SETTINGS_COLUMNS}''',
+        guild_id, rate)
+    return GuildSettings(*result)
+
+
+class Decision(NamedTuple):
+    status: str
+    reason: Optional[str]
+    decided_by: Optional[int]
+    anonymous: bool
+
+
+class Suggestion(NamedTuple):
+    """A full suggestions row: everything needed to render its embed."""
+    suggestion_id: str
+    guild_id: int
+    user_id: int
+    channel_id: Optional[int]
+    message_id: Optional[int]
+    thread_id: Optional[int]
+    title: str
+    description: str
+    pros: str
+    cons: str
+    image_url: Optional[str]
+    status: str
+    created_at: str
+    decision_reason: Optional[str]
+    decided_anonymously: int
+    decided_by: Optional[int]
+    author_name: Optional[str]
+    author_icon_url: Optional[str]
+    version: int
+
+    def decision(self):
+        if self.status == 'pending':
+            return None
+        return Decision(self.status, self.decision_reason, self.decided_by,
+                        bool(self.decided_anonymously))
+
+
+SUGGESTION_COLUMNS = ', '.join(Suggestion._fields)
+
+
+@db_helper
+def save_suggestion(conn, suggestion, rendered_hash=None):
+    with conn:
+        conn.execute(
+            f'''INSERT INTO suggestions ({SUGGESTION_COLUMNS}, rendered_hash)
+                VALUES ({', '.join('?' * (len(Suggestion._fields) + 1))})''',
+            (*suggestion, rendered_hash))
+
+
+@save_suggestion.postgres
+async def save_suggestion(conn, suggestion, rendered_hash=None):
+    placeholders = ', '.join(f'${n}' for n in
+                             range(1, len(Suggestion._fields) + 2))
+    await conn.execute(
+        f'''INSERT INTO suggestions ({SUGGESTION_COLUMNS}, rendered_hash)
+            VALUES ({placeholders})''',
+        *suggestion, rendered_hash)
+
+
+@db_helper
+def get_suggestion(conn, suggestion_id):
+    c = conn.execute(
+        f'SELECT {SUGGESTION_COLUMNS} FROM suggestions WHERE suggestion_id = ?',
+        (suggestion_id,))
+    result = c.fetchone()
+    return Suggestion(*result) if result else None
+
+
+@get_suggestion.postgres
+async def get_suggestion(conn, suggestion_id):
+    result = await conn.fetchrow(
+        f'SELECT {SUGGESTION_COLUMNS} FROM suggestions WHERE suggestion_id = $1',
+        suggestion_id)
+    return Suggestion(*result) if result else None
+
+
+@db_helper
+def store_message_details(conn, suggestion_id, channel_id, author_name,
+                          author_icon_url, decided_by=None):
+    """Fill in render details for suggestions posted before they were stored."""
+    with conn:
+        conn.execute(
+            '''UPDATE suggestions
+               SET channel_id = COALESCE(channel_id, ?), author_name = ?, author_icon_url = ?,
+                   decided_by = COALESCE(decided_by, ?), version = version + 1
+               WHERE suggestion_id = ?''',
+            (channel_id, author_name, author_icon_url, decided_by,
+             suggestion_id))
+
+
+@store_message_details.postgres
+async def store_message_details(conn, suggestion_id, channel_id, author_name,
+                                author_icon_url, decided_by=None):
+    await conn.execute(
+        '''UPDATE suggestions
+           SET channel_id = COALESCE(channel_id, $1), author_name = $2, author_icon_url = $3,
+               decided_by = COALESCE(decided_by, $4), version = version + 1
+           WHERE suggestion_id = $5''',
+        channel_id, author_name, author_icon_url, decided_by, suggestion_id)
+
+
+@db_helper
+def count_pending_suggestions(conn):
+    c = conn.execute(
+        "SELECT COUNT(*) FROM suggestions WHERE status = 'pending'")
+    return c.fetchone()[0]
+
+
+@count_pending_suggestions.postgres
+async def count_pending_suggestions(conn):
+    return await conn.fetchval(
+        "SELECT COUNT(*) FROM suggestions WHERE status = 'pending'")
+
+
+class RenderState(NamedTuple):
+    """A posted suggestion next to what its message and thread last showed."""
+    suggestion: Suggestion
+    upvotes: int
+    downvotes: int
+    rendered_hash: Optional[str]
+    thread_locked: int
+
+
+@db_helper
+def load_render_states(conn, guild_id, after='', limit=200):
+    """One page of a guild's posted suggestions, keyed on suggestion_id."""
+    c = conn.execute(
+        f'''SELECT {SUGGESTION_COLUMNS}, upvotes, downvotes, rendered_hash, thread_locked
+            FROM suggestions
+            WHERE guild_id = ? AND suggestion_id > ? AND message_id IS NOT NULL
+            ORDER BY suggestion_id LIMIT ?''',
+        (guild_id, after, limit))
+    fields = len(Suggestion._fields)
+    return [RenderState(Suggestion(*row[:fields]), *row[fields:])
+            for row in c.fetchall()]
+
+
+@load_render_states.postgres
+async def load_render_states(conn, guild_id, after='', limit=200):
+    rows = await conn.fetch(
+        f'''SELECT {SUGGESTION_COLUMNS}, upvotes, downvotes, rendered_hash, thread_locked
+            FROM suggestions
+            WHERE guild_id = $1 AND suggestion_id > $2 AND message_id IS NOT NULL
+            ORDER BY suggestion_id LIMIT $3''',
+        guild_id, after, limit)
+    fields = len(Suggestion._fields)
+    return [RenderState(Suggestion(*tuple(row)[:fields]), *tuple(row)[fields:])
+            for row in rows]
+
+
+@db_helper
+def store_render_state(conn, suggestion_id, rendered_hash=None,
+                       thread_locked=None):
+    """Record what a suggestion's message and thread were last updated to.
+
+    Leaves ``version`` alone: nothing rendered from the row changes.
+    """
+    with conn:
+        conn.execute(
+            '''UPDATE suggestions
+               SET rendered_hash = COALESCE(?, rendered_hash),
+                   thread_locked = COALESCE(?, thread_locked)
+               WHERE suggestion_id = ?''',
+            (rendered_hash, thread_locked, suggestion_id))
+
+
+@store_render_state.postgres
+async def store_render_state(conn, suggestion_id, rendered_hash=None,
+                             thread_locked=None):
+    await conn.execute(
+        '''UPDATE suggestions
+           SET rendered_hash = COALESCE($1, rendered_hash),
+               thread_locked = COALESCE($2, thread_locked)
+           WHERE suggestion_id = $3''',
+        rendered_hash, thread_locked, suggestion_id)
+
+
+class SearchResult(NamedTuple):
+    suggestion_id: str
+    guild_id: int
+    channel_id: Optional[int]
+    message_id: Optional[int]
+    title: str
+    status: str
+    upvotes: int
+    downvotes: int
+    snippet: str
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query that matches every word.
+
+    Each word is quoted, so FTS5 operators and punctuation typed by users
+    are searched for literally instead of raising syntax errors.
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"' for word in words) or None
+
+
+@db_helper
+def search_suggestions(conn, guild_id, query, status=None, limit=5, offset=0):
+    """Rank a guild's suggestions against ``query`` with bm25.
+
+    Returns ``(total_matches, [SearchResult, ...])`` for one page. Title
+    matches weigh ten times more than matches in the other fields.
+    """
+    match = (fts_query(query), guild_id, status, status)
+    # CROSS JOIN pins the index as the outer loop; otherwise the planner
+    # walks every suggestion in the guild and probes the index per row.
+    # FTS5 auxiliary functions cannot share a query with a window function,
+    # so the total is counted separately.
+    c = conn.execute(
+        '''SELECT COUNT(*)
+           FROM suggestions_fts
+           CROSS JOIN suggestions s ON s.suggestion_key = suggestions_fts.rowid
+           WHERE suggestions_fts MATCH ? AND s.guild_id = ? AND (? IS NULL OR s.status = ?)''',
+        match)
+    total = c.fetchone()[0]
+    if not total:
+        return 0, []
+
+    c = conn.execute(
+        '''SELECT s.suggestion_id, s.guild_id, s.channel_id, s.message_id, s.title, s.status,
+                  s.upvotes, s.downvotes,
+                  snippet(suggestions_fts, -1, '**', '**', '…', 16)
+           FROM suggestions_fts
+           CROSS JOIN suggestions s ON s.suggestion_key = suggestions_fts.rowid
+           WHERE suggestions_fts MATCH ? AND s.guild_id = ? AND (? IS NULL OR s.status = ?)
+           ORDER BY bm25(suggestions_fts, 10.0, 1.0, 1.0, 1.0)
+           LIMIT ? OFFSET ?''',
+        (*match, limit, offset))
+    return total, [SearchResult(*row) for row in c.fetchall()]
+
+
+@search_suggestions.postgres
+async def search_suggestions(conn, guild_id, query, status=None, limit=5,
+                             offset=0):
+    rows = await conn.fetch(
+        '''SELECT s.suggestion_id, s.guild_id, s.channel_id, s.message_id, s.title, s.status,
+                  s.upvotes, s.downvotes,
+                  ts_headline('english', s.description, q,
+                              'StartSel=**, StopSel=**, MaxWords=16, MinWords=8'),
+                  COUNT(*) OVER ()
+           FROM suggestions s, websearch_to_tsquery('english', $1) q
+           WHERE s.search @@ q AND s.guild_id = $2 AND ($3::text IS NULL OR s.status = $3)
+           ORDER BY ts_rank_cd(s.search, q) DESC
+           LIMIT $4 OFFSET $5''',
+        query, guild_id, status, limit, offset)
+    total = rows[0][-1] if rows else 0
+    return total, [SearchResult(*tuple(row)[:-1]) for row in rows]
+
+
+class SuggestionRecord(NamedTuple):
+    """The columns interaction handlers need, without the long text fields."""
+    suggestion_id: str
+    guild_id: int
+    status: str
+    channel_id: Optional[int]
+    message_id: Optional[int]
+    thread_id: Optional[int]
+    upvotes: int
+    downvotes: int
+    version: int
+
+    def tallies(self, delta=None):
+        """Vote counts in get_votes form, plus any buffered ``delta``."""
+        delta = delta or {'upvote': 0, 'downvote': 0}
+        return {'upvote': self.upvotes + delta['upvote'],
+                'downvote': self.downvotes + delta['downvote']}
+
+
+RECORD_COLUMNS = ', '.join(SuggestionRecord._fields)
+
+
+@db_helper
+def load_pending_records(conn, guild_ids, limit):
+    """The most recently posted pending suggestions of the given guilds."""
+    c = conn.execute(
+        f'''SELECT {RECORD_COLUMNS} FROM suggestions
+            WHERE status = 'pending' AND guild_id IN (SELECT value FROM json_each(?))
+            ORDER BY created_at DESC LIMIT ?''',
+        (json.dumps(guild_ids), limit))
+    return [SuggestionRecord(*row) for row in c.fetchall()]
+
+
+@load_pending_records.postgres
+async def load_pending_records(conn, guild_ids, limit):
+    rows = await conn.fetch(
+        f'''SELECT {RECORD_COLUMNS} FROM suggestions
+            WHERE status = 'pending' AND guild_id = ANY($1::bigint[])
+            ORDER BY created_at DESC LIMIT $2''',
+        guild_ids, limit)
+    return [SuggestionRecord(*row) for row in rows]
+
+
+@db_helper
+def load_suggestion_texts(conn, guild_ids, after='', limit=1000):
+    """One page of ``(suggestion_id, guild_id, title, description)`` rows.
+
+    Pages are keyed on suggestion_id: pass the last ID of a page as
+    ``after`` to get the next one.
+    """
+    c = conn.execute(
+        '''SELECT suggestion_id, guild_id, title, description FROM suggestions
+           WHERE guild_id IN (SELECT value FROM json_each(?)) AND suggestion_id > ?
+           ORDER BY suggestion_id LIMIT ?''',
+        (json.dumps(guild_ids), after, limit))
+    return c.fetchall()
+
+
+@load_suggestion_texts.postgres
+async def load_suggestion_texts(conn, guild_ids, after='', limit=1000):
+    rows = await conn.fetch(
+        '''SELECT suggestion_id, guild_id, title, description FROM suggestions
+           WHERE guild_id = ANY($1::bigint[]) AND suggestion_id > $2
+           ORDER BY suggestion_id LIMIT $3''',
+        guild_ids, after, limit)
+    return [tuple(row) for row in rows]
+
+
+@db_helper
+def load_ranking_rows(conn, guild_ids):
+    """Every pending suggestion of the given guilds, as RankingIndex rows."""
+    c = conn.execute(
+        '''SELECT suggestion_id, guild_id, title, created_at, upvotes, downvotes, channel_id, message_id
+           FROM suggestions
+           WHERE status = 'pending' AND guild_id IN (SELECT value FROM json_each(?))''',
+        (json.dumps(guild_ids),))
+    return c.fetchall()
+
+
+@load_ranking_rows.postgres
+async def load_ranking_rows(conn, guild_ids):
+    rows = await conn.fetch(
+        '''SELECT suggestion_id, guild_id, title, created_at, upvotes, downvotes, channel_id, message_id
+           FROM suggestions
+           WHERE status = 'pending' AND guild_id = ANY($1::bigint[])''',
+        guild_ids)
+    return [tuple(row) for row in rows]
+
+
+@db_helper
+def fetch_suggestion_record(conn, suggestion_id):
+    c = conn.execute(
+        f'SELECT {RECORD_COLUMNS} FROM suggestions WHERE suggestion_id = ?',
+        (suggestion_id,))
+    result = c.fetchone()
+    return SuggestionRecord(*result) if result else None
+
+
+@fetch_suggestion_record.postgres
+async def fetch_suggestion_record(conn, suggestion_id):
+    result = await conn.fetchrow(
+        f'SELECT {RECORD_COLUMNS} FROM suggestions WHERE suggestion_id = $1',
+        suggestion_id)
+    return SuggestionRecord(*result) if result else None
+
+
+@db_helper
+def store_suggestion_status(conn, suggestion_id, status, reason=None,
+                            anonymous=False, guild_id=None, decided_by=None):
+    """Record a decision; returns the updated SuggestionRecord, or None.
+
+    With ``guild_id`` only a suggestion from that guild is updated.
+    """
+    with conn:
+        c = conn.execute(
+            f'''UPDATE suggestions
+                SET status = ?, decision_reason = ?, decided_anonymously = ?, decided_by = ?,
+                    version = version + 1
+                WHERE suggestion_id = ? AND (? IS NULL OR guild_id = ?)
+                RETURNING {RECORD_COLUMNS}''',
+            (status, reason, 1 if anonymous else 0, decided_by, suggestion_id,
+             guild_id, guild_id))
+        result = c.fetchone()
+    return SuggestionRecord(*result) if result else None
+
+
+@store_suggestion_status.postgres
+async def store_suggestion_status(conn, suggestion_id, status, reason=None,
+                                  anonymous=False, guild_id=None,
+                                  decided_by=None):
+    result = await conn.fetchrow(
+        f'''UPDATE suggestions
+            SET status = $1, decision_reason = $2, decided_anonymously = $3, decided_by = $4,
+                version = version + 1
+            WHERE suggestion_id = $5 AND ($6::bigint IS NULL OR guild_id = $6)
+            RETURNING {RECORD_COLUMNS}''',
+        status, reason, 1 if anonymous else 0, decided_by, suggestion_id,
+        guild_id)
+    return SuggestionRecord(*result) if result else None
+
+
+@db_helper
+def store_bulk_decision(conn, guild_id, status, reason, anonymous, decided_by,
+                        suggestion_ids=None, created_before=None,
+                        max_score=None):
+    """Decide every matching pending suggestion in one transaction.
+
+    Returns the SuggestionRecords of the suggestions that were decided.
+    """
+    clauses = ["guild_id = ?", "status = 'pending'"]
+    params = [guild_id]
+    if suggestion_ids is not None:
+        clauses.append(
+            f'suggestion_id IN ({", ".join("?" * len(suggestion_ids))})')
+        params.extend(suggestion_ids)
+    if created_before is not None:
+        clauses.append('created_at < ?')
+        params.append(created_before)
+    if max_score is not None:
+        clauses.append('upvotes - downvotes < ?')
+        params.append(max_score)
+
+    with conn:
+        c = conn.execute(
+            f'''UPDATE suggestions
+                SET status = ?, decision_reason = ?, decided_anonymously = ?, decided_by = ?,
+                    version = version + 1
+                WHERE {' AND '.join(clauses)}
+                RETURNING {RECORD_COLUMNS}''',
+            [status, reason, 1 if anonymous else 0, decided_by, *params])
+        return [SuggestionRecord(*row) for row in c.fetchall()]
+
+
+@store_bulk_decision.postgres
+async def store_bulk_decision(conn, guild_id, status, reason, anonymous,
+                              decided_by, suggestion_ids=None,
+                              created_before=None, max_score=None):
+    params = [status, reason, 1 if anonymous else 0, decided_by, guild_id]
+    clauses = ["guild_id = $5", "status = 'pending'"]
+    if suggestion_ids is not None:
+        params.append(list(suggestion_ids))
+        clauses.append(f'suggestion_id = ANY(${len(params)}::text[])')
+    if created_before is not None:
+        params.append(created_before)
+        clauses.append(f'created_at < ${len(params)}')
+    if max_score is not None:
+        params.append(max_score)
+        clauses.append(f'upvotes - downvotes < ${len(params)}')
+
+    rows = await conn.fetch(
+        f'''UPDATE suggestions
+            SET status = $1, decision_reason = $2, decided_anonymously = $3, decided_by = $4,
+                version = version + 1
+            WHERE {' AND '.join(clauses)}
+            RETURNING {RECORD_COLUMNS}''',
+        *params)
+    return [SuggestionRecord(*row) for row in rows]
+
+
+# SQLite's votes table stores each vote as its index here
+VOTE_TYPES = ('downvote', 'upvote')
+
+
+@db_helper
+def get_votes(conn, suggestion_id):
+    c = conn.execute(
+        'SELECT upvotes, downvotes FROM suggestions WHERE suggestion_id = ?',
+        (suggestion_id,))
+    result = c.fetchone()
+    if not result:
+        return {'upvote': 0, 'downvote': 0}
+    return {'upvote': result[0], 'downvote': result[1]}
+
+
+@get_votes.postgres
+async def get_votes(conn, suggestion_id):
+    result = await conn.fetchrow(
+        'SELECT upvotes, downvotes FROM suggestions WHERE suggestion_id = $1',
+        suggestion_id)
+    if not result:
+        return {'upvote': 0, 'downvote': 0}
+    return {'upvote': result[0], 'downvote': result[1]}
+
+
+@db_helper
+def recount_votes(conn, guild_id=None):
+    """Rebuild the materialized tallies from the votes table.
+
+    Returns the number of suggestions whose counters had drifted.
+    """
+    with conn:
+        c = conn.execute(
+            '''UPDATE suggestions
+               SET upvotes   = (SELECT COUNT(*) FROM votes v
+                                WHERE v.suggestion_key = suggestions.suggestion_key
+                                  AND v.vote = 1),
+                   downvotes = (SELECT COUNT(*) FROM votes v
+                                WHERE v.suggestion_key = suggestions.suggestion_key
+                                  AND v.vote = 0)
+               WHERE (? IS NULL OR guild_id = ?)
+                 AND (upvotes IS NOT (SELECT COUNT(*) FROM votes v
+                                      WHERE v.suggestion_key = suggestions.suggestion_key
+                                        AND v.vote = 1)
+                  OR downvotes IS NOT (SELECT COUNT(*) FROM votes v
+                                       WHERE v.suggestion_key = suggestions.suggestion_key
+                                         AND v.vote = 0))''',
+            (guild_id, guild_id))
+    return c.rowcount
+
+
+@recount_votes.postgres
+async def recount_votes(conn, guild_id=None):
+    status = await conn.execute(
+        '''WITH counts AS (
+               SELECT s.suggestion_id,
+                      COUNT(*) FILTER (WHERE v.vote_type = 'upvote') AS upvotes,
+                      COUNT(*) FILTER (WHERE v.vote_type = 'downvote') AS downvotes
+               FROM suggestions s
+               LEFT JOIN votes v ON v.suggestion_id = s.suggestion_id
+               WHERE $1::bigint IS NULL OR s.guild_id = $1
+               GROUP BY s.suggestion_id
+           )
+           UPDATE suggestions
+           SET upvotes = counts.upvotes, downvotes = counts.downvotes
+           FROM counts
+           WHERE suggestions.suggestion_id = counts.suggestion_id
+             AND (suggestions.upvotes IS DISTINCT FROM counts.upvotes
+              OR suggestions.downvotes IS DISTINCT FROM counts.downvotes)''',
+        guild_id)
+    return rows_affected(status)
+
+
+@db_helper
+def get_vote_state(conn, suggestion_id, user_id):
+    """Return the user's stored vote and the suggestion's tallies in one read."""
+    c = conn.execute(
+        '''SELECT v.vote, s.upvotes, s.downvotes
+           FROM suggestions s
+           LEFT JOIN votes v ON v.suggestion_key = s.suggestion_key AND v.user_id = ?
+           WHERE s.suggestion_id = ?''',
+        (user_id, suggestion_id))
     result = c.fetchone()
-    conn.close()
-    return result
+    if not result:
+        return None, {'upvote': 0, 'downvote': 0}
+    vote = VOTE_TYPES[result[0]] if result[0] is not None else None
+    return vote, {'upvote': result[1], 'downvote': result[2]}
+
+
+@get_vote_state.postgres
+async def get_vote_state(conn, suggestion_id, user_id):
+    result = await conn.fetchrow(
+        '''SELECT v.vote_type, s.upvotes, s.downvotes
+           FROM suggestions s
+           LEFT JOIN votes v ON v.suggestion_id = s.suggestion_id AND v.user_id = $1
+           WHERE s.suggestion_id = $2''',
+        user_id, suggestion_id)
+    if not result:
+        return None, {'upvote': 0, 'downvote': 0}
+    return result[0], {'upvote': result[1], 'downvote': result[2]}
+
+
+@db_helper
+def toggle_vote(conn, suggestion_id, user_id, vote_type):
+    """Apply one vote button click atomically.
+
+    Clicking the user's current vote removes it, clicking the other one
+    switches it, otherwise the vote is added. Returns
+    ``(previous_vote, new_vote, tallies)``.
+    """
+    with conn:
+        c = conn.execute(
+            'SELECT suggestion_key FROM suggestions WHERE suggestion_id = ?',
+            (suggestion_id,))
+        result = c.fetchone()
+        if not result:
+            return None, None, {'upvote': 0, 'downvote': 0}
+        key, code = result[0], VOTE_TYPES.index(vote_type)
+
+        c = conn.execute(
+            '''DELETE FROM votes
+               WHERE suggestion_key = ? AND user_id = ? AND vote = ?
+               RETURNING vote''',
+            (key, user_id, code))
+        if c.fetchone():
+            previous, vote = vote_type, None
+        else:
+            c = conn.execute(
+                '''UPDATE votes SET vote = ?
+                   WHERE suggestion_key = ? AND user_id = ?
+                   RETURNING vote''',
+                (code, key, user_id))
+            if c.fetchone():
+                previous = 'downvote' if vote_type == 'upvote' else 'upvote'
+            else:
+                conn.execute('INSERT INTO votes VALUES (?, ?, ?)',
+                             (key, user_id, code))
+                previous = None
+            vote = vote_type
+
+        c = conn.execute(
+            'SELECT upvotes, downvotes FROM suggestions WHERE suggestion_key = ?',
+            (key,))
+        result = c.fetchone()
+    return previous, vote, {'upvote': result[0], 'downvote': result[1]}
+
+
+@toggle_vote.postgres
+async def toggle_vote(conn, suggestion_id, user_id, vote_type):
+    async with conn.transaction():
+        # Lock the suggestion first: the tally trigger would take this lock
+        # anyway, and holding it up front keeps a double click by the same
+        # user from racing two INSERTs
+        exists = await conn.fetchval(
+            'SELECT 1 FROM suggestions WHERE suggestion_id = $1 FOR UPDATE',
+            suggestion_id)
+        if not exists:
+            return None, None, {'upvote': 0, 'downvote': 0}
+
+        previous = await conn.fetchval(
+            '''DELETE FROM votes WHERE suggestion_id = $1 AND user_id = $2
+               RETURNING vote_type''',
+            suggestion_id, user_id)
+        vote = None if previous == vote_type else vote_type
+        if vote:
+            await conn.execute('INSERT INTO votes VALUES ($1, $2, $3)',
+                               suggestion_id, user_id, vote)
+
+        result = await conn.fetchrow(
+            'SELECT upvotes, downvotes FROM suggestions WHERE suggestion_id = $1',
+            suggestion_id)
+    return previous, vote, {'upvote': result[0], 'downvote': result[1]}
+
+
+@db_helper
+def write_votes(conn, changes):
+    """Apply ``(suggestion_id, user_id, vote_type)`` changes in one transaction.
+
+    A ``vote_type`` of None removes the user's vote.
+    """
+    with conn:
+        conn.executemany(
+            '''DELETE FROM votes
+               WHERE suggestion_key = (SELECT suggestion_key FROM suggestions
+                                       WHERE suggestion_id = ?)
+                 AND user_id = ?''',
+            [(s_id, u_id) for s_id, u_id, vote in changes if vote is None])
+        # Votes for unknown suggestions match no row and are dropped
+        conn.executemany(
+            '''INSERT INTO votes
+               SELECT suggestion_key, ?, ? FROM suggestions WHERE suggestion_id = ?
+               ON CONFLICT(suggestion_key, user_id) DO UPDATE SET vote = excluded.vote''',
+            [(u_id, VOTE_TYPES.index(vote), s_id)
+             for s_id, u_id, vote in changes if vote is not None])
+
+
+@write_votes.postgres
+async def write_votes(conn, changes):
+    # Sorted so concurrent batches lock suggestion rows in the same order
+    changes = sorted(changes, key=lambda change: change[:2])
+    async with conn.transaction():
+        await conn.executemany(
+            'DELETE FROM votes WHERE suggestion_id = $1 AND user_id = $2',
+            [(s_id, u_id) for s_id, u_id, vote in changes if vote is None])
+        await conn.executemany(
+            '''INSERT INTO votes VALUES ($1, $2, $3)
+               ON CONFLICT(suggestion_id, user_id) DO UPDATE SET vote_type = excluded.vote_type''',
+            [change for change in changes if change[2] is not None])
+
+
+@db_helper
+def import_suggestions(conn, suggestions):
+    """Insert Suggestion rows in one transaction, skipping IDs already present.
+
+    Tallies start at zero; importing the votes afterwards fills them in.
+    Returns the IDs that were inserted.
+    """
+    inserted = []
+    with conn:
+        for suggestion in suggestions:
+            c = conn.execute(
+                f'''INSERT INTO suggestions ({SUGGESTION_COLUMNS})
+                    VALUES ({', '.join('?' * len(Suggestion._fields))})
+                    ON CONFLICT(suggestion_id) DO NOTHING''',
+                suggestion)
+            if c.rowcount:
+                inserted.append(suggestion.suggestion_id)
+    return inserted
+
+
+@import_suggestions.postgres
+async def import_suggestions(conn, suggestions):
+    placeholders = ', '.join(f'${n}' for n in
+                             range(1, len(Suggestion._fields) + 1))
+    inserted = []
+    async with conn.transaction():
+        for suggestion in suggestions:
+            suggestion_id = await conn.fetchval(
+                f'''INSERT INTO suggestions ({SUGGESTION_COLUMNS})
+                    VALUES ({placeholders})
+                    ON CONFLICT(suggestion_id) DO NOTHING
+                    RETURNING suggestion_id''',
+                *suggestion)
+            if suggestion_id is not None:
+                inserted.append(suggestion_id)
+    return inserted
+
+
+# Guild settings cache
+class SettingsCache:
+    """In-memory copy of guild_settings, loaded per shard and written through.
+
+    Settings only change through the set_* helpers, so interaction handlers
+    read configuration without touching the database.
+    """
+
+    def __init__(self):
+        self._settings = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._settings)
+
+    async def load(self, guild_ids):
+        settings = await load_guild_settings(guild_ids)
+        for guild_id in guild_ids:
+            # Unconfigured guilds are cached as None too
+            self._settings[guild_id] = settings.get(guild_id)
+
+    async def get(self, guild_id):
+        if guild_id in self._settings:
+            self.hits += 1
+            return self._settings[guild_id]
+
+        self.misses += 1
+        settings = await fetch_guild_settings(guild_id)
+        # Unconfigured guilds are cached as None too
+        self._settings[guild_id] = settings
+        return settings
+
+    def put(self, guild_id, settings):
+        self._settings[guild_id] = settings
+
+
+settings_cache = SettingsCache()
+
+
+async def get_guild_settings(guild_id):
+    return await settings_cache.get(guild_id)
+
+
+async def set_suggestion_channel(guild_id, channel_id):
+    settings_cache.put(guild_id,
+                       await store_suggestion_channel(guild_id, channel_id))
+
+
+async def set_reviewer_role(guild_id, role_id):
+    settings_cache.put(guild_id, await store_reviewer_role(guild_id, role_id))
+
+
+async def set_blocked_role(guild_id, role_id):
+    settings_cache.put(guild_id, await store_blocked_role(guild_id, role_id))
+
+
+async def set_rate_limit(guild_id, limit, rate):
+    settings_cache.put(guild_id,
+                       await store_rate_limit(guild_id, limit, rate))
+
+
+# Suggestion record cache
+class SuggestionCache:
+    """Bounded LRU cache of SuggestionRecords.
+
+    Pending and decided suggestions are kept in separate LRU segments.
+    Voting is closed on decided suggestions, so they are evicted first when
+    the cache is full.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._pending = OrderedDict()
+        self._decided = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._pending) + len(self._decided)
+
+    async def get(self, suggestion_id):
+        for segment in (self._pending, self._decided):
+            record = segment.get(suggestion_id)
+            if record:
+                segment.move_to_end(suggestion_id)
+                self.hits += 1
+                return record
+
+        self.misses += 1
+        record = await fetch_suggestion_record(suggestion_id)
+        if record:
+            self.put(record)
+        return record
+
+    def put(self, record):
+        self.invalidate(record.suggestion_id)
+        if self.max_size <= 0:
+            return
+        segment = self._pending if record.status == 'pending' else self._decided
+        segment[record.suggestion_id] = record
+
+        while len(self) > self.max_size:
+            (self._decided or self._pending).popitem(last=False)
+
+    def update_tallies(self, suggestion_id, votes):
+        record = self._pending.get(suggestion_id)
+        if record:
+            self._pending[suggestion_id] = record._replace(
+                upvotes=votes['upvote'], downvotes=votes['downvote'])
+
+    def invalidate(self, suggestion_id):
+        self._pending.pop(suggestion_id, None)
+        self._decided.pop(suggestion_id, None)
+
+
+suggestion_cache = SuggestionCache(SUGGESTION_CACHE_SIZE)
+
+
+async def get_suggestion_record(suggestion_id):
+    return await suggestion_cache.get(suggestion_id)
+
+
+async def update_suggestion_status(suggestion_id, status, reason=None,
+                                   anonymous=False, guild_id=None,
+                                   decided_by=None):
+    suggestion = await store_suggestion_status(suggestion_id, status, reason,
+                                               anonymous, guild_id, decided_by)
+    if suggestion:
+        suggestion_cache.put(suggestion)
+        if suggestion.status != 'pending':
+            ranking_index.discard(suggestion.guild_id, suggestion_id)
+    return suggestion
+
+
+# Duplicate detection
+# Estimated similarity at which a new suggestion counts as a near-duplicate
+# of an existing one (0 disables the check)
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.3"))
+
+
+class DuplicateIndex:
+    """Per-guild MinHash/LSH index over suggestion titles and descriptions.
+
+    Each text becomes its set of adjacent word pairs, summarized by a
+    MinHash signature using one-permutation hashing: every pair is hashed
+    once and only its bin's minimum is kept, so signing a 4000-character
+    description costs one hash per pair. Signatures are split into bands;
+    suggestions sharing any band are candidates, and candidates are ranked
+    by how many bins agree.
+
+    Pairs rather than single words keep a community's common vocabulary
+    from putting most suggestions into the same few buckets.
+    """
+
+    BINS = 64
+    ROWS = 2  # bins per band, must divide BINS; 32 bands catch ~99% of pairs at 0.3
+    EMPTY = 0xFFFFFFFFFFFFFFFF
+    STOPWORDS = frozenset(
+        'a an and are as at be but by can could for from has have i if in '
+        'is it its more of on or should so that the their there this to '
+        'was we were will with would you your'.split())
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        # guild_id -> {suggestion_id: signature}
+        self._signatures = defaultdict(dict)
+        # guild_id -> {band key: [suggestion_id, ...]}
+        self._buckets = defaultdict(lambda: defaultdict(list))
+        self._titles = {}
+
+    def __len__(self):
+        return len(self._titles)
+
+    @classmethod
+    def signature(cls, title, description):
+        words = [word for word in re.findall(r'\w+', f'{title}\n{description}'.lower())
+                 if word not in cls.STOPWORDS]
+        shingles = set(zip(words, words[1:])) or set(words)
+
+        bins = array('Q', [cls.EMPTY]) * cls.BINS
+        for shingle in shingles:
+            value = hash(shingle) & cls.EMPTY
+            index = value % cls.BINS
+            value //= cls.BINS
+            if value < bins[index]:
+                bins[index] = value
+        return bins
+
+    @classmethod
+    def _band_keys(cls, signature):
+        for start in range(0, cls.BINS, cls.ROWS):
+            band = signature[start:start + cls.ROWS]
+            # Bands of empty bins (short texts) would match every short text
+            if band.count(cls.EMPTY) < cls.ROWS:
+                yield hash((start, band.tobytes()))
+
+    @classmethod
+    def similarity(cls, a, b):
+        """Share of bins that agree, ignoring bins empty in both."""
+        matching = sum(map(operator.eq, a, b))
+        filled = cls.BINS
+        if cls.EMPTY in a and cls.EMPTY in b:
+            both_empty = sum(1 for x, y in zip(a, b) if x == y == cls.EMPTY)
+            matching -= both_empty
+            filled -= both_empty
+        return matching / filled if filled else 0.0
+
+    def add(self, guild_id, suggestion_id, title, description,
+            signature=None):
+        if signature is None:
+            signature = self.signature(title, description)
+        if suggestion_id in self._signatures[guild_id]:
+            return
+        self._signatures[guild_id][suggestion_id] = signature
+        self._titles[suggestion_id] = title
+        buckets = self._buckets[guild_id]
+        for key in self._band_keys(signature):
+            buckets[key].append(suggestion_id)
+
+    def find(self, guild_id, title, description, limit=3):
+        """The closest existing suggestions as ``[(similarity, suggestion_id)]``."""
+        if self.threshold <= 0 or guild_id not in self._signatures:
+            return []
+
+        signature = self.signature(title, description)
+        buckets = self._buckets[guild_id]
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(buckets.get(key, ()))
+
+        signatures = self._signatures[guild_id]
+        matches = []
+        for suggestion_id in candidates:
+            score = self.similarity(signature, signatures[suggestion_id])
+            if score >= self.threshold:
+                matches.append((score, suggestion_id))
+        matches.sort(reverse=True)
+        return matches[:limit]
+
+    def title(self, suggestion_id):
+        return self._titles.get(suggestion_id)
+
+    async def load(self, guild_ids):
+        """Index every suggestion of the given guilds from the database.
+
+        Signatures are computed in a worker thread a page at a time; only
+        the dict inserts run on the event loop.
+        """
+        after = ''
+        while True:
+            rows = await load_suggestion_texts(guild_ids, after)
+            if not rows:
+                break
+            signatures = await asyncio.to_thread(
+                lambda: [self.signature(title, description)
+                         for _, _, title, description in rows])
+            for (suggestion_id, guild_id, title, _), signature in zip(
+                    rows, signatures):
+                self.add(guild_id, suggestion_id, title, None, signature)
+            after = rows[-1][0]
+
 
+duplicate_index = DuplicateIndex(DUPLICATE_THRESHOLD)
 
-def update_suggestion_status(suggestion_id, status, reason=None,
-                             anonymous=False):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        'UPDATE suggestions SET status = ?, decision_reason = ?, decided_anonymously = ? WHERE suggestion_id = ?',
-        (status, reason, 1 if anonymous else 0, suggestion_id))
-    conn.commit()
-    conn.close()
 
+# Rankings
+# Hours for a vote's weight in the trending score to halve
+TRENDING_HALF_LIFE = float(os.getenv("TRENDING_HALF_LIFE", "24"))
 
-def add_vote(suggestion_id, user_id, vote_type):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
+
+def created_timestamp(created_at):
     try:
-        c.execute('INSERT INTO votes VALUES (?, ?, ?)',
-                  (suggestion_id, user_id, vote_type))
-        conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
+        return datetime.fromisoformat(created_at).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+class RankedSuggestion(NamedTuple):
+    suggestion_id: str
+    title: str
+    created_at: str
+    upvotes: int
+    downvotes: int
+    # Decayed net votes, scaled by RankingIndex's growth factor
+    trend: float
+    channel_id: Optional[int]
+    message_id: Optional[int]
+
+    @property
+    def score(self):
+        return self.upvotes - self.downvotes
+
+    @property
+    def controversy(self):
+        """Many votes, split evenly: total votes ** (minority / majority)."""
+        if not self.upvotes or not self.downvotes:
+            return 0.0
+        balance = (min(self.upvotes, self.downvotes) /
+                   max(self.upvotes, self.downvotes))
+        return (self.upvotes + self.downvotes) ** balance
+
+
+class RankingIndex:
+    """In-memory rankings of each guild's pending suggestions.
+
+    Loaded per shard and updated on every vote, so the ranking commands
+    never count votes in the database. Pages are cut with heapq, which
+    costs O(n log k) per page instead of a full sort.
+
+    Trending is net votes with exponential decay. Rather than decaying
+    every entry as time passes, each vote is added with weight
+    ``exp(decay * (t - epoch))``; dividing by the same factor for "now"
+    gives the decayed value, and the order never needs it. The epoch is
+    moved forward before the weights can overflow. Vote times are not
+    stored, so on load a suggestion's net score counts as if it had been
+    cast when the suggestion was posted.
+    """
+
+    def __init__(self, half_life_hours):
+        self.decay = math.log(2) / (half_life_hours * 3600)
+        self._epoch = time.time()
+        # guild_id -> {suggestion_id: RankedSuggestion}
+        self._guilds = defaultdict(dict)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._guilds.values())
+
+    def _weight(self, amount, at):
+        exponent = self.decay * (at - self._epoch)
+        if exponent > 500:
+            self._rebase(at)
+            exponent = 0.0
+        return amount * math.exp(exponent)
+
+    def _rebase(self, now):
+        factor = math.exp(-self.decay * (now - self._epoch))
+        for entries in self._guilds.values():
+            for suggestion_id, entry in entries.items():
+                entries[suggestion_id] = entry._replace(
+                    trend=entry.trend * factor)
+        self._epoch = now
+
+    def trending(self, entry):
+        """The entry's decayed net votes as of now."""
+        return entry.trend / self._weight(1.0, time.time())
+
+    def add(self, guild_id, suggestion_id, title, created_at, votes,
+            channel_id=None, message_id=None):
+        entries = self._guilds[guild_id]
+        entry = entries.get(suggestion_id)
+        if entry:
+            trend = entry.trend
+        else:
+            trend = self._weight(votes['upvote'] - votes['downvote'],
+                                 created_timestamp(created_at))
+        entries[suggestion_id] = RankedSuggestion(
+            suggestion_id, title, created_at, votes['upvote'],
+            votes['downvote'], trend, channel_id, message_id)
+
+    def update_votes(self, guild_id, suggestion_id, votes):
+        entries = self._guilds.get(guild_id)
+        entry = entries.get(suggestion_id) if entries else None
+        if not entry:
+            return
+        change = (votes['upvote'] - votes['downvote']) - entry.score
+        entries[suggestion_id] = entry._replace(
+            upvotes=votes['upvote'], downvotes=votes['downvote'],
+            trend=entry.trend + self._weight(change, time.time()))
+
+    def discard(self, guild_id, suggestion_id):
+        self._guilds.get(guild_id, {}).pop(suggestion_id, None)
+
+    def page(self, guild_id, sort, page, size):
+        """One page of ranked entries and the total entry count."""
+        entries = self._guilds.get(guild_id, {}).values()
+        count = (page + 1) * size
+        if sort == 'top':
+            ranked = heapq.nlargest(count, entries, key=lambda e: e.score)
+        elif sort == 'trending':
+            ranked = heapq.nlargest(count, entries, key=lambda e: e.trend)
+        elif sort == 'controversial':
+            ranked = heapq.nlargest(count, entries,
+                                    key=lambda e: e.controversy)
+        else:
+            ranked = heapq.nsmallest(count, entries,
+                                     key=lambda e: e.created_at)
+        return ranked[page * size:], len(entries)
+
+    async def load(self, guild_ids):
+        async with vote_buffer.reading():
+            deltas = vote_buffer.pending_deltas()
+            rows = await load_ranking_rows(guild_ids)
+        for (suggestion_id, guild_id, title, created_at, upvotes, downvotes,
+             channel_id, message_id) in rows:
+            delta = deltas.get(suggestion_id, {'upvote': 0, 'downvote': 0})
+            self.add(guild_id, suggestion_id, title, created_at,
+                     {'upvote': upvotes + delta['upvote'],
+                      'downvote': downvotes + delta['downvote']},
+                     channel_id, message_id)
+
+
+ranking_index = RankingIndex(TRENDING_HALF_LIFE)
+
+
+# Write-behind vote buffer
+class VoteBuffer:
+    """Acknowledges votes immediately and writes them to the votes table in batches.
+
+    Pending votes are merged per (suggestion_id, user_id), so toggling back
+    and forth between flushes costs a single row write. Every acknowledged
+    vote is appended to a journal file first; the journal is replayed on
+    startup, so a crash between flushes does not lose votes.
+    """
+
+    def __init__(self, journal_path, interval, batch_size):
+        self.journal_path = journal_path
+        self.interval = interval
+        self.batch_size = batch_size
+        # (suggestion_id, user_id) -> [vote stored in the DB, latest vote]
+        self._pending = {}
+        self._journal = None
+        self._wake = asyncio.Event()
+        self._task = None
+        # One batch in flight at a time: batches must commit in order, and
+        # the journal may only be compacted once nothing is in flight
+        self._flush_lock = asyncio.Lock()
+        # (suggestion_id, user_id) -> [lock, clicks holding or awaiting it]
+        self._clicks = {}
+        # Reads pairing buffered votes with the database hold flushes off
+        self._readers = 0
+        self._no_readers = asyncio.Event()
+        self._no_readers.set()
+        self._not_flushing = asyncio.Event()
+        self._not_flushing.set()
+
+    async def recover(self):
+        """Replay votes journaled by a previous run that never reached the DB."""
+        latest = {}
+        try:
+            with open(self.journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        suggestion_id, user_id, vote = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-write
+                        continue
+                    latest[(suggestion_id, user_id)] = vote
+        except FileNotFoundError:
+            pass
 
+        if latest:
+            await write_votes([(s_id, u_id, vote) for (s_id, u_id), vote in
+                               latest.items()])
+            print(f'Recovered {len(latest)} journaled vote(s)')
+
+        self._journal = open(self.journal_path, 'w', encoding='utf-8',
+                             buffering=1)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    @asynccontextmanager
+    async def reading(self):
+        """Hold off flushes while buffered votes are combined with a database read.
+
+        A batch flushed between reading the buffer and reading the database
+        would be counted twice or not at all, depending on whether the read
+        saw it, and on a connection pool there is no telling which. Flushes
+        wait for readers to finish, and new readers wait for the flush.
+        """
+        while not self._not_flushing.is_set():
+            await self._not_flushing.wait()
+        self._readers += 1
+        self._no_readers.clear()
+        try:
+            yield
+        finally:
+            self._readers -= 1
+            if not self._readers:
+                self._no_readers.set()
+
+    def pending_deltas(self):
+        """Buffered tally changes per suggestion.
+
+        Add them to counts read from the database in the same ``reading()``
+        block, so nothing is counted twice.
+        """
+        deltas = defaultdict(lambda: {'upvote': 0, 'downvote': 0})
+        for (s_id, _), (stored, vote) in self._pending.items():
+            if stored:
+                deltas[s_id][stored] -= 1
+            if vote:
+                deltas[s_id][vote] += 1
+        return deltas
+
+    def pending_delta(self, suggestion_id):
+        delta = {'upvote': 0, 'downvote': 0}
+        for (s_id, _), (stored, vote) in self._pending.items():
+            if s_id != suggestion_id:
+                continue
+            if stored:
+                delta[stored] -= 1
+            if vote:
+                delta[vote] += 1
+        return delta
+
+    async def get_votes(self, suggestion_id):
+        async with self.reading():
+            delta = self.pending_delta(suggestion_id)
+            votes = await get_votes(suggestion_id)
+        return {vote_type: count + delta[vote_type] for vote_type, count in
+                votes.items()}
+
+    async def toggle(self, suggestion_id, user_id, vote_type):
+        """Apply a vote button click; returns ``(previous, new, tallies)``.
+
+        With buffering disabled this is a straight ``toggle_vote``.
+        """
+        if self.interval <= 0:
+            return await toggle_vote(suggestion_id, user_id, vote_type)
+
+        # A double click must see the first click's vote, so clicks by the
+        # same user on the same suggestion run one at a time
+        key = (suggestion_id, user_id)
+        click = self._clicks.get(key)
+        if click is None:
+            click = self._clicks[key] = [asyncio.Lock(), 0]
+        click[1] += 1
+        try:
+            async with click[0]:
+                return await self._toggle(suggestion_id, user_id, vote_type)
+        finally:
+            click[1] -= 1
+            if not click[1]:
+                del self._clicks[key]
+
+    async def _toggle(self, suggestion_id, user_id, vote_type):
+        async with self.reading():
+            delta = self.pending_delta(suggestion_id)
+            stored_vote, votes = await get_vote_state(suggestion_id, user_id)
+
+            entry = self._pending.get((suggestion_id, user_id))
+            previous = entry[1] if entry else stored_vote
+            vote = None if previous == vote_type else vote_type
+            self._record(suggestion_id, user_id, stored_vote, vote)
+
+        votes = {key: count + delta[key] for key, count in votes.items()}
+        if previous:
+            votes[previous] -= 1
+        if vote:
+            votes[vote] += 1
+        return previous, vote, votes
+
+    def _record(self, suggestion_id, user_id, stored_vote, vote):
+        """Journal a vote change; ``stored_vote`` is what the DB holds."""
+        key = (suggestion_id, user_id)
+        self._journal.write(json.dumps([suggestion_id, user_id, vote]) + '\n')
+
+        entry = self._pending.get(key)
+        if entry:
+            stored_vote = entry[0]
+        if vote == stored_vote:
+            # Toggled back to what the DB already has
+            self._pending.pop(key, None)
+        else:
+            self._pending[key] = [stored_vote, vote]
+
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self):
+        """Write the buffered votes; waits for a flush already in flight."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            self._not_flushing.clear()
+            try:
+                while self._readers:
+                    await self._no_readers.wait()
+                await self._write_batch()
+            finally:
+                self._not_flushing.set()
+
+    async def _write_batch(self):
+        batch, self._pending = self._pending, {}
+        try:
+            await write_votes(
+                [(s_id, u_id, vote) for (s_id, u_id), (_, vote) in
+                 batch.items()])
+        except Exception:
+            # Keep the batch, but let votes recorded since take precedence
+            for key, (stored, vote) in batch.items():
+                entry = self._pending.get(key)
+                if entry:
+                    entry[0] = stored
+                else:
+                    self._pending[key] = [stored, vote]
+            raise
+
+        self._compact_journal()
+
+    def _compact_journal(self):
+        # Rewrite the journal with only the votes still waiting to be flushed
+        tmp_path = f'{self.journal_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for (s_id, u_id), (_, vote) in self._pending.items():
+                f.write(json.dumps([s_id, u_id, vote]) + '\n')
+        self._journal.close()
+        os.replace(tmp_path, self.journal_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8',
+                             buffering=1)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                metrics.inc('errors_total', where='vote_flush')
+                print(f'Error flushing votes: {e}')
+
+
+vote_buffer = VoteBuffer(VOTE_JOURNAL, VOTE_FLUSH_INTERVAL, VOTE_FLUSH_BATCH)
+
+
+# Embed rendering
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "512"))
+
+
+def results_text(votes):
+    return f'Upvotes: {votes["upvote"]} ✅\nDownvotes: {votes["downvote"]} ❌'
+
+
+def decision_text(decision):
+    if decision.anonymous:
+        reviewer = 'Anonymous Reviewer'
+    elif decision.decided_by:
+        reviewer = f'<@{decision.decided_by}>'
+    else:
+        # Decided before reviewers were recorded
+        reviewer = 'Unknown Reviewer'
+
+    text = f'{DECISION_STYLES[decision.status].decided_by}: {reviewer}'
+    if decision.reason:
+        text += f'\nReason: {decision.reason}'
+    return text
+
+
+def render_suggestion_embed(suggestion, tallies, decision):
+    """Build a suggestion's whole embed from database state.
+
+    Pure function of its arguments, so the result can be memoized and the
+    message edited by ID without fetching the current embed first.
+    """
+    style = DECISION_STYLES[decision.status] if decision else None
+
+    embed = discord.Embed(
+        title=suggestion.title,
+        color=style.color() if style else discord.Color.blue(),
+        timestamp=datetime.fromisoformat(suggestion.created_at)
+    )
 
-def remove_vote(suggestion_id, user_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute('DELETE FROM votes WHERE suggestion_id = ? AND user_id = ?',
-              (suggestion_id, user_id))
-    conn.commit()
-    conn.close()
+    if suggestion.author_name:
+        embed.set_author(name=suggestion.author_name,
+                         icon_url=suggestion.author_icon_url)
 
+    embed.add_field(name='Description', value=suggestion.description,
+                    inline=False)
 
-def get_votes(suggestion_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        'SELECT vote_type, COUNT(*) FROM votes WHERE suggestion_id = ? GROUP BY vote_type',
-        (suggestion_id,))
-    results = c.fetchall()
-    conn.close()
+    if suggestion.pros:
+        embed.add_field(name='Pros', value=suggestion.pros, inline=False)
 
-    votes = {'upvote': 0, 'downvote': 0}
-    for vote_type, count in results:
-        votes[vote_type] = count
-    return votes
+    if suggestion.cons:
+        embed.add_field(name='Cons', value=suggestion.cons, inline=False)
 
+    embed.add_field(name='Results:' if decision else 'Results so far:',
+                    value=results_text(tallies), inline=False)
+
+    if decision:
+        embed.add_field(name=style.field_name, value=decision_text(decision),
+                        inline=False)
+
+    embed.set_footer(
+        text=f'User ID: {suggestion.user_id} | Suggestion ID: {suggestion.suggestion_id}')
+
+    if suggestion.image_url:
+        embed.set_image(url=suggestion.image_url)
+
+    return embed
 
-def get_user_vote(suggestion_id, user_id):
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        'SELECT vote_type FROM votes WHERE suggestion_id = ? AND user_id = ?',
-        (suggestion_id, user_id))
-    result = c.fetchone()
-    conn.close()
-    return result[0] if result else None
+
+def embed_hash(embed):
+    """Fingerprint of what an embed shows, stored with each edit it is sent in."""
+    data = json.dumps(embed.to_dict(), sort_keys=True).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class RenderCache:
+    """LRU of full suggestion rows keyed on (suggestion_id, version).
+
+    ``version`` is bumped whenever a rendered column changes, so a results
+    edit reads the long text columns once per version and only fills in
+    the latest tally; tallies change on every edit and are not part of
+    the key.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._rows = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, key):
+        suggestion = self._rows.get(key)
+        if suggestion is None:
+            self.misses += 1
+            return None
+        self._rows.move_to_end(key)
+        self.hits += 1
+        return suggestion
+
+    def put(self, suggestion):
+        if self.max_size <= 0:
+            return
+        key = (suggestion.suggestion_id, suggestion.version)
+        self._rows[key] = suggestion
+        self._rows.move_to_end(key)
+        while len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+
+
+render_cache = RenderCache(RENDER_CACHE_SIZE)
+
+
+def suggestion_message(guild_id, channel_id, message_id):
+    """A handle for editing a suggestion message without fetching it."""
+    channel = bot.get_partial_messageable(channel_id, guild_id=guild_id)
+    return channel.get_partial_message(message_id)
+
+
+def missing_message_details(suggestion):
+    """Whether a suggestion predates storing its author or its reviewer."""
+    return suggestion.message_id and (not suggestion.author_name or (
+        suggestion.status != 'pending' and not suggestion.decided_anonymously
+        and suggestion.decided_by is None))
+
+
+def legacy_reviewer(suggestion, embed):
+    """The reviewer mentioned in a message decided before reviewers were stored.
+
+    0 when the decision field names nobody, so the message isn't fetched
+    again; None when there is no named reviewer to look for.
+    """
+    style = DECISION_STYLES.get(suggestion.status)
+    if (style is None or suggestion.decided_anonymously
+            or suggestion.decided_by is not None):
+        return None
+    for field in embed.fields if embed else ():
+        if field.name == style.field_name:
+            match = re.match(rf'{re.escape(style.decided_by)}: <@!?(\d+)>',
+                             field.value or '')
+            if match:
+                return int(match.group(1))
+    return 0
+
+
+async def load_suggestion(suggestion_id, channel_id):
+    suggestion = await get_suggestion(suggestion_id)
+    if suggestion and missing_message_details(suggestion):
+        # Posted or decided before the author and reviewer were stored: copy
+        # them off the message once
+        message = await suggestion_message(suggestion.guild_id, channel_id,
+                                           suggestion.message_id).fetch()
+        embed = message.embeds[0] if message.embeds else None
+        author = embed.author if embed else None
+        await store_message_details(
+            suggestion_id, channel_id, author.name if author else None,
+            author.icon_url if author else None,
+            legacy_reviewer(suggestion, embed))
+        suggestion_cache.invalidate(suggestion_id)
+        suggestion = await get_suggestion(suggestion_id)
+    return suggestion
+
+
+async def render_suggestion(record, votes, channel_id):
+    suggestion = render_cache.get((record.suggestion_id, record.version))
+    if suggestion is None:
+        suggestion = await load_suggestion(record.suggestion_id, channel_id)
+        render_cache.put(suggestion)
+    return render_suggestion_embed(suggestion, votes, suggestion.decision())
+
+
+# Embed re-render scheduler
+async def edit_results(suggestion_id, channel_id, votes=None):
+    """Re-render a suggestion message with the latest tally."""
+    record = await get_suggestion_record(suggestion_id)
+    if not record or not record.message_id:
+        return
+
+    channel_id = record.channel_id or channel_id
+    if votes is None:
+        votes = await vote_buffer.get_votes(suggestion_id)
+
+    embed = await render_suggestion(record, votes, channel_id)
+
+    metrics.inc('message_edits_total', source='results')
+    await suggestion_message(record.guild_id, channel_id,
+                             record.message_id).edit(embed=embed)
+    await store_render_state(suggestion_id, embed_hash(embed))
+
+
+class RenderScheduler:
+    """Coalesces results edits so a message is edited at most once per window.
+
+    Votes only mark a message dirty. A per-message task edits it right away,
+    then waits out the window; anything that arrived meanwhile is folded into
+    a single follow-up edit rendered from the latest tally. When discord.py
+    reports a long rate limit, every message in that channel backs off for
+    the time the bucket asks for.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        # suggestion_id -> (channel_id, votes) waiting to be re-rendered
+        self._dirty = {}
+        self._tasks = {}
+        # channel_id -> loop time at which the edit bucket frees up
+        self._channel_resume = {}
+
+    def __len__(self):
+        return len(self._dirty)
+
+    def discard(self, suggestion_id):
+        """Drop a pending re-render, e.g. once the suggestion has been decided."""
+        self._dirty.pop(suggestion_id, None)
+
+    def mark_dirty(self, suggestion_id, channel_id, votes=None):
+        self._dirty[suggestion_id] = (channel_id, votes)
+        if suggestion_id not in self._tasks:
+            self._tasks[suggestion_id] = asyncio.create_task(
+                self._render(suggestion_id))
+
+    def close(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._dirty.clear()
+
+    async def _render(self, suggestion_id):
+        loop = asyncio.get_running_loop()
+        try:
+            while suggestion_id in self._dirty:
+                channel_id = self._dirty[suggestion_id][0]
+
+                resume = self._channel_resume.get(channel_id, 0)
+                if resume > loop.time():
+                    await asyncio.sleep(resume - loop.time())
+                    continue
+                self._channel_resume.pop(channel_id, None)
+
+                # Pop only once we are about to edit, so clicks during the
+                # wait above are carried by this edit
+                channel_id, votes = self._dirty.pop(suggestion_id)
+                try:
+                    with metrics.time('render_seconds'):
+                        await edit_results(suggestion_id, channel_id, votes)
+                except discord.RateLimited as e:
+                    metrics.inc('render_backoffs_total')
+                    self._channel_resume[channel_id] = loop.time() + e.retry_after
+                    self._dirty.setdefault(suggestion_id, (channel_id, votes))
+                    continue
+                except (discord.Forbidden, discord.NotFound):
+                    pass
+                except discord.HTTPException as e:
+                    metrics.inc('errors_total', where='render')
+                    print(f'Error updating suggestion {suggestion_id}: {e}')
+
+                await asyncio.sleep(self.interval)
+        finally:
+            self._tasks.pop(suggestion_id, None)
+
+
+render_scheduler = RenderScheduler(EMBED_EDIT_INTERVAL)
+
+metrics.gauge('pending_suggestions', count_pending_suggestions)
+metrics.gauge('settings_cache_entries', lambda: len(settings_cache))
+metrics.counter('settings_cache_hits_total', lambda: settings_cache.hits)
+metrics.counter('settings_cache_misses_total', lambda: settings_cache.misses)
+metrics.gauge('suggestion_cache_entries', lambda: len(suggestion_cache))
+metrics.counter('suggestion_cache_hits_total', lambda: suggestion_cache.hits)
+metrics.counter('suggestion_cache_misses_total',
+                lambda: suggestion_cache.misses)
+metrics.gauge('vote_buffer_pending', lambda: len(vote_buffer))
+metrics.gauge('render_queue_dirty', lambda: len(render_scheduler))
+metrics.gauge('render_cache_entries', lambda: len(render_cache))
+metrics.gauge('duplicate_index_entries', lambda: len(duplicate_index))
+metrics.gauge('ranking_index_entries', lambda: len(ranking_index))
+metrics.counter('render_cache_hits_total', lambda: render_cache.hits)
 
 
 def check_missing_permissions(channel, required_perms):
@@ -245,6 +2674,179 @@ def check_missing_permissions(channel, required_perms):
     return missing
 
 
+# Media
+# Suggestion images are downloaded, checked and kept here by content hash
+MEDIA_DIR = os.getenv("MEDIA_DIR", "media")
+MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(8 * 1024 * 1024)))
+# Longest side of the copy posted with a suggestion; needs Pillow, without
+# it images are posted as uploaded
+MEDIA_MAX_DIMENSION = int(os.getenv("MEDIA_MAX_DIMENSION", "1600"))
+MEDIA_CHUNK_SIZE = 64 * 1024
+# Seconds a form with an image stays open; its download is dropped after
+MEDIA_FORM_TIMEOUT = 1800
+
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+
+def sniff_image(head):
+    """The file extension matching an image's first bytes, or None."""
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+class DownloadedImage(NamedTuple):
+    data: bytes
+    extension: str
+
+
+class ImageRejected(Exception):
+    """An attachment that can't be posted; the message is shown to its author."""
+
+
+def shrink_image(data, target):
+    """Write ``data`` to ``target`` scaled to MEDIA_MAX_DIMENSION, without metadata.
+
+    Returns False, writing nothing, when Pillow is not installed or the
+    image is animated.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return False
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if getattr(image, 'is_animated', False):
+                return False
+            image_format = image.format
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((MEDIA_MAX_DIMENSION, MEDIA_MAX_DIMENSION))
+            options = ({'quality': 85} if image_format in ('JPEG', 'WEBP')
+                       else {})
+            image.save(target, format=image_format, **options)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise ImageRejected('That image could not be read.') from None
+    return True
+
+
+class MediaStore:
+    """Content-addressed copies of suggestion images.
+
+    Attachments are streamed in chunks and abandoned as soon as they pass
+    ``max_bytes`` or turn out not to start like an image. Only images that
+    are posted are stored, under their SHA-256 and by worker threads, so the
+    same image uploaded twice is only kept once. Suggestions are posted with
+    the stored copy attached and refer to it as ``attachment://<name>``,
+    which keeps their embeds valid after Discord's CDN link for the upload
+    expires.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._session = None
+        self._executor = ThreadPoolExecutor(max_workers=2,
+                                            thread_name_prefix='media')
+
+    def path(self, filename):
+        return self.directory / filename[:2] / filename
+
+    async def download(self, url):
+        """Download an attachment into a DownloadedImage, checking its header."""
+        with metrics.time('media_fetch_seconds'):
+            return await self._download(url)
+
+    async def store(self, image):
+        """Store a downloaded image; returns the name to post it as."""
+        loop = asyncio.get_running_loop()
+        filename, stored = await loop.run_in_executor(self._executor,
+                                                      self._store, image)
+        metrics.inc('media_images_total',
+                    result='stored' if stored else 'duplicate')
+        return filename
+
+    async def _download(self, url):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=60))
+
+        too_large = ImageRejected(
+            f'Images can be at most {self.max_bytes // (1024 * 1024)} MB.')
+        chunks = []
+        size = 0
+        extension = None
+        try:
+            async with self._session.get(url) as response:
+                response.raise_for_status()
+                if (response.content_length or 0) > self.max_bytes:
+                    raise too_large
+                async for chunk in response.content.iter_chunked(
+                        MEDIA_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise too_large
+                    chunks.append(chunk)
+                    if extension is None and size >= 12:
+                        extension = sniff_image(b''.join(chunks)[:12])
+                        if extension is None:
+                            break
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            raise ImageRejected(
+                'The image could not be downloaded. Please try again.'
+            ) from None
+
+        if extension is None:
+            raise ImageRejected(
+                'That file is not a PNG, JPEG, GIF or WebP image.')
+        return DownloadedImage(b''.join(chunks), extension)
+
+    def _store(self, image):
+        # Runs on the media threads: hashing, resizing and disk writes
+        data, extension = image
+        digest = hashlib.sha256(data).hexdigest()
+        filename = f'{digest}.{extension}'
+        path = self.path(filename)
+        if path.exists():
+            return filename, False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed, so a half-written file
+        # never passes for a stored one
+        temporary = path.with_name(f'{digest}.{secrets.token_hex(4)}.tmp')
+        try:
+            if not shrink_image(data, temporary):
+                temporary.write_bytes(data)
+            temporary.replace(path)
+        finally:
+            temporary.unlink(missing_ok=True)
+        return filename, True
+
+    def file(self, image_url):
+        """A discord.File for an ``attachment://`` image URL, else None."""
+        if not image_url or not image_url.startswith('attachment://'):
+            return None
+        filename = image_url.removeprefix('attachment://')
+        return discord.File(self.path(filename), filename=filename)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._executor.shutdown(wait=False)
+
+
+media_store = MediaStore(MEDIA_DIR, MEDIA_MAX_BYTES)
+
+
 # Modal for suggestion form
 class SuggestionModal(discord.ui.Modal, title='Submit a Suggestion'):
     title_input = discord.ui.TextInput(
@@ -278,24 +2880,49 @@ class SuggestionModal(discord.ui.Modal, title='Submit a Suggestion'):
         required=True
     )
 
-    def __init__(self, image_url=None):
-        super().__init__()
-        self.image_url = image_url
-
+    def __init__(self, image=None):
+        # Without a timeout an abandoned form would hold its image forever
+        super().__init__(timeout=MEDIA_FORM_TIMEOUT if image else None)
+        # The image is downloaded while the form is being filled in
+        self.image_task = None
+        if image:
+            self.image_task = asyncio.create_task(
+                media_store.download(image.url))
+            # Retrieve the error of an abandoned form's download
+            self.image_task.add_done_callback(
+                lambda task: task.cancelled() or task.exception())
+
+    async def on_timeout(self):
+        if self.image_task:
+            self.image_task.cancel()
+            self.image_task = None
+
+    @instrumented('modal')
     async def on_submit(self, interaction: discord.Interaction):
-        settings = get_guild_settings(interaction.guild_id)
+        send = interaction.response.send_message
+        image = None
+        if self.image_task:
+            # Waiting on the download, then storing and uploading the image,
+            # can take longer than the 3 seconds Discord allows to respond
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            send = interaction.followup.send
+            try:
+                image = await self.image_task
+            except ImageRejected as e:
+                await send(f'❌ {e}', ephemeral=True)
+                return
+
+        settings = await get_guild_settings(interaction.guild_id)
 
         if not settings or not settings[0]:
-            await interaction.response.send_message(
-                '❌ Suggestion channel not set up. Contact an admin.',
-                ephemeral=True)
+            await send('❌ Suggestion channel not set up. Contact an admin.',
+                       ephemeral=True)
             return
 
         channel = interaction.guild.get_channel(settings[0])
         if not channel:
-            await interaction.response.send_message(
-                '❌ Suggestion channel not found. Contact an admin.',
-                ephemeral=True)
+            await send('❌ Suggestion channel not found. Contact an admin.',
+                       ephemeral=True)
             return
 
         # Check for required permissions
@@ -304,222 +2931,433 @@ class SuggestionModal(discord.ui.Modal, title='Submit a Suggestion'):
         missing_perms = check_missing_permissions(channel, required_perms)
 
         if missing_perms:
-            await interaction.response.send_message(
+            await send(
                 f'❌ Bot is missing required permissions in {channel.mention}:\n' +
                 '\n'.join(f'• {perm}' for perm in missing_perms),
                 ephemeral=True)
             return
 
-        suggestion_id = generate_suggestion_id()
-
-        # Create embed
-        embed = discord.Embed(
+        suggestion = Suggestion(
+            suggestion_id=generate_suggestion_id(),
+            guild_id=interaction.guild_id,
+            user_id=interaction.user.id,
+            channel_id=channel.id,
+            message_id=None,
+            thread_id=None,
             title=self.title_input.value,
-            color=discord.Color.blue(),
-            timestamp=datetime.now(timezone.utc)
-        )
+            description=self.description_input.value,
+            pros=self.pros_input.value or '',
+            cons=self.cons_input.value or '',
+            image_url=None,
+            status='pending',
+            created_at=datetime.now(timezone.utc).isoformat(),
+            decision_reason=None,
+            decided_anonymously=0,
+            decided_by=None,
+            author_name=interaction.user.display_name,
+            author_icon_url=interaction.user.display_avatar.url,
+            version=0)
+
+        with metrics.time('duplicate_check_seconds'):
+            duplicates = duplicate_index.find(
+                interaction.guild_id, suggestion.title, suggestion.description)
+        if duplicates:
+            metrics.inc('duplicate_warnings_total')
+            await send(
+                embed=await duplicates_embed(interaction.guild_id, duplicates),
+                view=DuplicateWarningView(suggestion, channel, image),
+                ephemeral=True)
+            return
 
-        embed.set_author(
-            name=interaction.user.display_name,
-            icon_url=interaction.user.display_avatar.url
-        )
+        await send(await post_suggestion(suggestion, channel, image),
+                   ephemeral=True)
 
-        embed.add_field(name='Description', value=self.description_input.value,
-                        inline=False)
 
-        if self.pros_input.value:
-            embed.add_field(name='Pros', value=self.pros_input.value,
-                            inline=False)
+async def post_suggestion(suggestion, channel, image=None):
+    """Post a suggestion with its thread and save it; returns the reply text."""
+    view = SuggestionView(suggestion.suggestion_id)
 
-        if self.cons_input.value:
-            embed.add_field(name='Cons', value=self.cons_input.value,
-                            inline=False)
+    try:
+        files = []
+        if image:
+            # Stored only once posted, so abandoned forms leave nothing behind
+            filename = await media_store.store(image)
+            suggestion = suggestion._replace(
+                image_url=f'attachment://{filename}')
+            files.append(media_store.file(suggestion.image_url))
+
+        embed = render_suggestion_embed(suggestion,
+                                        {'upvote': 0, 'downvote': 0}, None)
+        message = await channel.send(embed=embed, view=view, files=files)
+
+        # Create thread
+        thread = await message.create_thread(
+            name=suggestion.title[:80],
+            auto_archive_duration=10080  # 7 days
+        )
 
-        embed.add_field(name='Results so far:',
-                        value='Upvotes: 0 ✅\nDownvotes: 0 ❌', inline=False)
+        suggestion = suggestion._replace(message_id=message.id,
+                                         thread_id=thread.id)
+        await save_suggestion(suggestion, embed_hash(embed))
+        render_cache.put(suggestion)
+        duplicate_index.add(suggestion.guild_id, suggestion.suggestion_id,
+                            suggestion.title, suggestion.description)
+        ranking_index.add(suggestion.guild_id, suggestion.suggestion_id,
+                          suggestion.title, suggestion.created_at,
+                          {'upvote': 0, 'downvote': 0}, channel.id,
+                          message.id)
+
+        return '✅ Suggestion submitted!'
+    except ImageRejected as e:
+        return f'❌ {e}'
+    except discord.Forbidden:
+        return '❌ Bot lacks permissions to send messages or create threads.'
+    except Exception as e:
+        return f'❌ Error creating suggestion: {str(e)}'
+
+
+async def duplicates_embed(guild_id, duplicates):
+    embed = discord.Embed(
+        title='⚠️ This looks similar to existing suggestions',
+        description='Consider voting on one of these instead of posting a '
+                    'duplicate.',
+        color=discord.Color.orange())
+    for score, suggestion_id in duplicates:
+        record = await get_suggestion_record(suggestion_id)
+        if not record:
+            continue
+        style = DECISION_STYLES.get(record.status)
+        link = message_link(guild_id, record.channel_id, record.message_id)
+        embed.add_field(
+            name=f'{style.emoji if style else "🕒"} '
+                 f'{duplicate_index.title(suggestion_id)}'[:256],
+            value=f'`{suggestion_id}` · {score:.0%} similar'
+                  + (f' · [Jump to suggestion]({link})' if link else ''),
+            inline=False)
+    return embed
+
+
+class DuplicateWarningView(discord.ui.View):
+    """Lets the author post a suspected duplicate anyway, or drop it."""
+
+    def __init__(self, suggestion, channel, image=None):
+        super().__init__(timeout=600)
+        self.suggestion = suggestion
+        self.channel = channel
+        self.image = image
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.suggestion.user_id
+
+    @discord.ui.button(label='Post anyway', style=discord.ButtonStyle.primary)
+    async def post_anyway(self, interaction: discord.Interaction,
+                          button: discord.ui.Button):
+        self.stop()
+        await interaction.response.defer()
+        content = await post_suggestion(self.suggestion, self.channel,
+                                        self.image)
+        await interaction.edit_original_response(content=content, embed=None,
+                                                 view=None)
+
+    @discord.ui.button(label='Cancel', style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction,
+                     button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(
+            content='🗑️ Suggestion discarded.', embed=None, view=None)
+
+
+# Rate limiting
+class RateLimit(NamedTuple):
+    default: int
+    # Seconds over which ``rate`` actions are allowed
+    period: float
+    description: str
+
+
+RATE_LIMITS = {
+    'vote_rate_limit': RateLimit(
+        int(os.getenv("VOTE_RATE_LIMIT", "20")), 60,
+        'Votes per user per minute'),
+    'suggestion_vote_rate_limit': RateLimit(
+        int(os.getenv("SUGGESTION_VOTE_RATE_LIMIT", "300")), 60,
+        'Votes per suggestion per minute'),
+    'submission_rate_limit': RateLimit(
+        int(os.getenv("SUBMISSION_RATE_LIMIT", "5")), 3600,
+        'Suggestions per user per hour'),
+}
+
+
+def rate_limit(settings, limit):
+    rate = getattr(settings, limit) if settings else None
+    return RATE_LIMITS[limit].default if rate is None else rate
+
+
+class RateLimiter:
+    """In-memory token buckets, one per limit and key.
+
+    A bucket holds up to ``rate`` tokens and refills continuously at ``rate``
+    per period; each action spends one. Checking needs only the cached guild
+    settings, so excess clicks are turned away before any database or
+    Discord work. Buckets that have refilled completely are the same as
+    missing ones and are pruned as the table grows.
+    """
+
+    def __init__(self):
+        # (limit, key) -> (tokens, updated, rate)
+        self._buckets = {}
+        self._prune_at = 1024
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, settings, limit, key):
+        """Spend a token; returns 0, or the seconds until one is available."""
+        rate = rate_limit(settings, limit)
+        if rate <= 0:
+            return 0
+
+        period = RATE_LIMITS[limit].period
+        now = time.monotonic()
+        tokens, updated, _ = self._buckets.get((limit, key), (rate, now, rate))
+        tokens = min(rate, tokens + (now - updated) * rate / period)
+        if tokens < 1:
+            self._buckets[(limit, key)] = (tokens, now, rate)
+            metrics.inc('rate_limited_total', limit=limit)
+            return (1 - tokens) * period / rate
+
+        self._buckets[(limit, key)] = (tokens - 1, now, rate)
+        if len(self._buckets) > self._prune_at:
+            self._prune(now)
+        return 0
+
+    def _prune(self, now):
+        self._buckets = {
+            (limit, key): (tokens, updated, rate)
+            for (limit, key), (tokens, updated, rate) in self._buckets.items()
+            if tokens + (now - updated) * rate / RATE_LIMITS[limit].period < rate}
+        self._prune_at = max(1024, 2 * len(self._buckets))
+
+
+rate_limiter = RateLimiter()
+metrics.gauge('rate_limiter_buckets', lambda: len(rate_limiter))
+
+
+# Vote buttons
+VOTE_REPLIES = {
+    'upvote': ('🔄 Upvote removed.', '✅ Changed to upvote.', '✅ Upvoted!'),
+    'downvote': ('🔄 Downvote removed.', '❌ Changed to downvote.',
+                 '❌ Downvoted!'),
+}
+
+
+@instrumented('button')
+async def handle_vote(interaction: discord.Interaction, suggestion_id,
+                      vote_type):
+    settings = await get_guild_settings(interaction.guild_id)
+    retry_after = rate_limiter.take(settings, 'vote_rate_limit',
+                                    (interaction.guild_id, interaction.user.id))
+    if retry_after:
+        await interaction.response.send_message(
+            f'⏳ You are voting too fast. Try again in '
+            f'{math.ceil(retry_after)}s.', ephemeral=True)
+        return
 
-        embed.set_footer(
-            text=f'User ID: {interaction.user.id} | Suggestion ID: {suggestion_id}')
+    retry_after = rate_limiter.take(settings, 'suggestion_vote_rate_limit',
+                                    suggestion_id)
+    if retry_after:
+        await interaction.response.send_message(
+            f'⏳ This suggestion is getting a lot of votes right now. Try '
+            f'again in {math.ceil(retry_after)}s.', ephemeral=True)
+        return
 
-        if self.image_url:
-            embed.set_image(url=self.image_url)
+    suggestion = await get_suggestion_record(suggestion_id)
+    if not suggestion:
+        await interaction.response.send_message('❌ Suggestion not found.',
+                                                ephemeral=True)
+        return
 
-        view = SuggestionView(suggestion_id)
+    # Check if suggestion belongs to this guild
+    if suggestion.guild_id != interaction.guild_id:
+        await interaction.response.send_message(
+            '❌ Suggestion not found.',
+            ephemeral=True)
+        return
 
-        try:
-            message = await channel.send(embed=embed, view=view)
+    if suggestion.status != 'pending':
+        await interaction.response.send_message(
+            '❌ Voting is closed for this suggestion.', ephemeral=True)
+        return
 
-            # Create thread
-            thread = await message.create_thread(
-                name=f"{self.title_input.value[:80]}" if len(
-                    self.title_input.value) > 80 else f"{self.title_input.value}",
-                auto_archive_duration=10080  # 7 days
-            )
+    previous, vote, votes = await vote_buffer.toggle(
+        suggestion_id, interaction.user.id, vote_type)
+    removed, changed, added = VOTE_REPLIES[vote_type]
+    if vote is None:
+        metrics.inc('votes_total', vote_type=vote_type, action='removed')
+        await interaction.response.send_message(removed, ephemeral=True)
+    elif previous:
+        metrics.inc('votes_total', vote_type=vote_type, action='changed')
+        await interaction.response.send_message(changed, ephemeral=True)
+    else:
+        metrics.inc('votes_total', vote_type=vote_type, action='added')
+        await interaction.response.send_message(added, ephemeral=True)
+
+    suggestion_cache.update_tallies(suggestion_id, votes)
+    ranking_index.update_votes(suggestion.guild_id, suggestion_id, votes)
+    render_scheduler.mark_dirty(suggestion_id, interaction.channel_id, votes)
+
+
+class VoteButton(discord.ui.DynamicItem[discord.ui.Button],
+                 template=r'(?P<vote>upvote|downvote):(?P<id>[a-z0-9]+)'):
+    """Vote button matched by custom_id, so no per-suggestion view is kept."""
+
+    def __init__(self, vote_type, suggestion_id):
+        super().__init__(
+            discord.ui.Button(
+                emoji='✅' if vote_type == 'upvote' else '❌',
+                style=discord.ButtonStyle.grey,
+                custom_id=f'{vote_type}:{suggestion_id}'))
+        self.vote_type = vote_type
+        self.suggestion_id = suggestion_id
 
-            save_suggestion(
-                suggestion_id,
-                interaction.guild_id,
-                interaction.user.id,
-                message.id,
-                thread.id,
-                self.title_input.value,
-                self.description_input.value,
-                self.pros_input.value or '',
-                self.cons_input.value or '',
-                self.image_url
-            )
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction,
+                             item: discord.ui.Button, match):
+        return cls(match['vote'], match['id'])
 
-            await interaction.response.send_message(
-                '✅ Suggestion submitted!', ephemeral=True)
-        except discord.Forbidden:
-            await interaction.response.send_message(
-                '❌ Bot lacks permissions to send messages or create threads.',
-                ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(
-                f'❌ Error creating suggestion: {str(e)}',
-                ephemeral=True)
+    async def callback(self, interaction: discord.Interaction):
+        await handle_vote(interaction, self.suggestion_id, self.vote_type)
 
 
-# Persistent view for voting
 class SuggestionView(discord.ui.View):
     def __init__(self, suggestion_id):
         super().__init__(timeout=None)
         self.suggestion_id = suggestion_id
 
-        up_btn = discord.ui.Button(emoji='✅', style=discord.ButtonStyle.grey,
-                                   custom_id=f'upvote:{suggestion_id}')
-        down_btn = discord.ui.Button(emoji='❌', style=discord.ButtonStyle.grey,
-                                     custom_id=f'downvote:{suggestion_id}')
+        self.add_item(VoteButton('upvote', suggestion_id))
+        self.add_item(VoteButton('downvote', suggestion_id))
 
-        up_btn.callback = self._handle_upvote
-        down_btn.callback = self._handle_downvote
 
-        self.add_item(up_btn)
-        self.add_item(down_btn)
+class PagerView(discord.ui.View):
+    """Prev/Next buttons for a paginated ephemeral reply.
 
-    async def update_embed(self, interaction: discord.Interaction):
-        suggestion = get_suggestion(self.suggestion_id)
-        if not suggestion:
-            return
+    ``render_page(page)`` returns ``(embed, page_count)``; it is called again
+    on every turn, so pages always show current data.
+    """
 
-        votes = get_votes(self.suggestion_id)
+    def __init__(self, user_id, render_page, page_count):
+        super().__init__(timeout=300)
+        self.user_id = user_id
+        self.render_page = render_page
+        self.page = 0
+        self.page_count = page_count
+        self._update_buttons()
 
-        embed = interaction.message.embeds[0]
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.page_count - 1
 
-        # Determine label based on status
-        status = suggestion[10]  # status column
-        label = 'Results:' if status in ['approved',
-                                         'rejected'] else 'Results so far:'
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.user_id
 
-        for i, field in enumerate(embed.fields):
-            if field.name in ['Results so far:', 'Results:']:
-                embed.set_field_at(
-                    i,
-                    name=label,
-                    value=f'Upvotes: {votes["upvote"]} ✅\nDownvotes: {votes["downvote"]} ❌',
-                    inline=False
-                )
-                break
+    async def turn_to(self, interaction, page):
+        embed, self.page_count = await self.render_page(page)
+        self.page = max(0, min(page, self.page_count - 1))
+        self._update_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
 
-        if status == 'approved':
-            embed.color = discord.Color.green()
-        elif status == 'rejected':
-            embed.color = discord.Color.red()
+    @discord.ui.button(label='◀ Prev', style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction,
+                            button: discord.ui.Button):
+        await self.turn_to(interaction, self.page - 1)
 
-        try:
-            await interaction.message.edit(embed=embed)
-        except discord.Forbidden:
-            pass
+    @discord.ui.button(label='Next ▶', style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction,
+                        button: discord.ui.Button):
+        await self.turn_to(interaction, self.page + 1)
 
-    async def _handle_upvote(self, interaction: discord.Interaction):
-        # Fetch fresh suggestion data from database
-        suggestion = get_suggestion(self.suggestion_id)
-        if not suggestion:
-            await interaction.response.send_message('❌ Suggestion not found.',
-                                                    ephemeral=True)
-            return
 
-        # Check if suggestion belongs to this guild
-        if suggestion[1] != interaction.guild_id:
-            await interaction.response.send_message(
-                '❌ Suggestion not found.',
-                ephemeral=True)
-            return
+def message_link(guild_id, channel_id, message_id):
+    if not channel_id or not message_id:
+        return None
+    return f'https://discord.com/channels/{guild_id}/{channel_id}/{message_id}'
 
-        if suggestion[10] != 'pending':
-            await interaction.response.send_message(
-                '❌ Voting is closed for this suggestion.', ephemeral=True)
-            return
 
-        current_vote = get_user_vote(self.suggestion_id, interaction.user.id)
-        if current_vote == 'upvote':
-            remove_vote(self.suggestion_id, interaction.user.id)
-            await interaction.response.send_message('🔄 Upvote removed.',
-                                                    ephemeral=True)
-        elif current_vote == 'downvote':
-            remove_vote(self.suggestion_id, interaction.user.id)
-            add_vote(self.suggestion_id, interaction.user.id, 'upvote')
-            await interaction.response.send_message('✅ Changed to upvote.',
-                                                    ephemeral=True)
-        else:
-            add_vote(self.suggestion_id, interaction.user.id, 'upvote')
-            await interaction.response.send_message('✅ Upvoted!',
-                                                    ephemeral=True)
+# Shards
+async def warm_shard(shard_id):
+    """Load settings, suggestions and indexes for one shard's guilds.
 
-        await self.update_embed(interaction)
+    Vote buttons are dynamic items matched by custom_id, so there are no
+    per-message views to restore. Cached settings and records only save
+    first interactions a database round trip; duplicate detection and the
+    ranking commands need their indexes to be loaded.
+    """
+    guild_ids = [guild.id for guild in bot.guilds
+                 if guild.shard_id == shard_id]
+    if not guild_ids:
+        return
 
-    async def _handle_downvote(self, interaction: discord.Interaction):
-        suggestion = get_suggestion(self.suggestion_id)
-        if not suggestion:
-            await interaction.response.send_message('❌ Suggestion not found.',
-                                                    ephemeral=True)
-            return
+    with metrics.time('shard_warmup_seconds', shard=shard_id):
+        await settings_cache.load(guild_ids)
+        await duplicate_index.load(guild_ids)
+        await ranking_index.load(guild_ids)
+        # Split the cache evenly between the shards this process runs
+        shards = bot.shard_ids or range(bot.shard_count or 1)
+        share = SUGGESTION_CACHE_SIZE // len(shards)
+        for record in reversed(await load_pending_records(guild_ids, share)):
+            suggestion_cache.put(record)
+    print(f'Shard {shard_id} ready with {len(guild_ids)} guild(s)')
 
-        # Check if suggestion belongs to this guild
-        if suggestion[1] != interaction.guild_id:
-            await interaction.response.send_message(
-                '❌ Suggestion not found.',
-                ephemeral=True)
-            return
 
-        if suggestion[10] != 'pending':
-            await interaction.response.send_message(
-                '❌ Voting is closed for this suggestion.', ephemeral=True)
-            return
+def shard_latencies():
+    # Latency is infinite until the first heartbeat is acknowledged
+    return {shard_id: latency for shard_id, latency in bot.latencies
+            if latency != float('inf')}
 
-        current_vote = get_user_vote(self.suggestion_id, interaction.user.id)
-        if current_vote == 'downvote':
-            remove_vote(self.suggestion_id, interaction.user.id)
-            await interaction.response.send_message('🔄 Downvote removed.',
-                                                    ephemeral=True)
-        elif current_vote == 'upvote':
-            remove_vote(self.suggestion_id, interaction.user.id)
-            add_vote(self.suggestion_id, interaction.user.id, 'downvote')
-            await interaction.response.send_message('❌ Changed to downvote.',
-                                                    ephemeral=True)
-        else:
-            add_vote(self.suggestion_id, interaction.user.id, 'downvote')
-            await interaction.response.send_message('❌ Downvoted!',
-                                                    ephemeral=True)
 
-        await self.update_embed(interaction)
+def shard_guilds():
+    guilds = defaultdict(int)
+    for guild in bot.guilds:
+        guilds[guild.shard_id] += 1
+    return guilds
+
+
+metrics.gauge('shard_latency_seconds', shard_latencies, label='shard')
+metrics.gauge('shard_guilds', shard_guilds, label='shard')
 
 
 @bot.event
-async def on_ready():
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute("SELECT suggestion_id FROM suggestions WHERE status = 'pending'")
-    rows = c.fetchall()
-    conn.close()
+async def on_shard_ready(shard_id):
+    metrics.inc('shard_events_total', shard=shard_id, event='ready')
+    try:
+        await warm_shard(shard_id)
+    except Exception as e:
+        metrics.inc('errors_total', where='warm_shard')
+        print(f'Error warming shard {shard_id}: {e}')
+
+    # Once per process: later READY events follow reconnects, not downtime
+    if RECONCILE_ON_STARTUP and shard_id not in reconciled_shards:
+        reconciled_shards.add(shard_id)
+        spawn(reconcile_shard(shard_id), 'reconcile')
 
-    for (suggestion_id,) in rows:
-        try:
-            bot.add_view(SuggestionView(suggestion_id))
-        except Exception:
-            pass
 
+@bot.event
+async def on_shard_connect(shard_id):
+    metrics.inc('shard_events_total', shard=shard_id, event='connect')
+
+
+@bot.event
+async def on_shard_disconnect(shard_id):
+    metrics.inc('shard_events_total', shard=shard_id, event='disconnect')
+
+
+@bot.event
+async def on_shard_resumed(shard_id):
+    metrics.inc('shard_events_total', shard=shard_id, event='resumed')
+
+
+@bot.event
+async def on_ready():
     try:
         synced = await bot.tree.sync()
         print(f'Logged in as {bot.user} (ID: {bot.user.id})')
@@ -531,9 +3369,10 @@ async def on_ready():
 # Commands
 @bot.tree.command(name='suggest', description='Submit a suggestion')
 @app_commands.describe(image='Optional image attachment')
+@instrumented('command')
 async def suggest(interaction: discord.Interaction,
                   image: discord.Attachment = None):
-    settings = get_guild_settings(interaction.guild_id)
+    settings = await get_guild_settings(interaction.guild_id)
 
     # Check if user has blocked role
     if settings and settings[2]:
@@ -544,15 +3383,26 @@ async def suggest(interaction: discord.Interaction,
                 ephemeral=True)
             return
 
-    image_url = None
+    retry_after = rate_limiter.take(settings, 'submission_rate_limit',
+                                    (interaction.guild_id, interaction.user.id))
+    if retry_after:
+        await interaction.response.send_message(
+            f'⏳ You have submitted too many suggestions. Try again '
+            f'<t:{math.ceil(time.time() + retry_after)}:R>.', ephemeral=True)
+        return
+
     if image:
-        if not image.content_type.startswith('image/'):
+        if not (image.content_type or '').startswith('image/'):
             await interaction.response.send_message(
                 '❌ Please attach a valid image file.', ephemeral=True)
             return
-        image_url = image.url
+        if image.size > MEDIA_MAX_BYTES:
+            await interaction.response.send_message(
+                f'❌ Images can be at most {MEDIA_MAX_BYTES // (1024 * 1024)} MB.',
+                ephemeral=True)
+            return
 
-    modal = SuggestionModal(image_url=image_url)
+    modal = SuggestionModal(image=image)
     await interaction.response.send_modal(modal)
 
 
@@ -560,9 +3410,10 @@ async def suggest(interaction: discord.Interaction,
                   description='Set the suggestions channel (Admin only)')
 @app_commands.describe(channel='The channel for suggestions')
 @app_commands.default_permissions(administrator=True)
+@instrumented('command')
 async def setchannel(interaction: discord.Interaction,
                      channel: discord.TextChannel):
-    set_suggestion_channel(interaction.guild_id, channel.id)
+    await set_suggestion_channel(interaction.guild_id, channel.id)
     await interaction.response.send_message(
         f'✅ Suggestion channel set to {channel.mention}', ephemeral=True)
 
@@ -571,8 +3422,9 @@ async def setchannel(interaction: discord.Interaction,
                   description='Set the role that can approve/reject suggestions (Admin only)')
 @app_commands.describe(role='The reviewer role')
 @app_commands.default_permissions(administrator=True)
+@instrumented('command')
 async def setreviewerrole(interaction: discord.Interaction, role: discord.Role):
-    set_reviewer_role(interaction.guild_id, role.id)
+    await set_reviewer_role(interaction.guild_id, role.id)
     await interaction.response.send_message(
         f'✅ Reviewer role set to {role.mention}', ephemeral=True)
 
@@ -581,27 +3433,174 @@ async def setreviewerrole(interaction: discord.Interaction, role: discord.Role):
                   description='Set a role that cannot submit suggestions (Admin only)')
 @app_commands.describe(role='The role to block from suggesting')
 @app_commands.default_permissions(administrator=True)
+@instrumented('command')
 async def setblockedrole(interaction: discord.Interaction, role: discord.Role):
-    set_blocked_role(interaction.guild_id, role.id)
+    await set_blocked_role(interaction.guild_id, role.id)
     await interaction.response.send_message(
         f'✅ Users with {role.mention} can no longer submit suggestions.',
         ephemeral=True)
 
 
-@bot.tree.command(name='approve',
-                  description='Approve a suggestion (Reviewer only)')
-@app_commands.describe(
-    suggestion_id='The ID of the suggestion',
-    reason='Optional reason',
-    anonymous='Approve anonymously (hides your name)')
-async def approve(interaction: discord.Interaction, suggestion_id: str,
-                  reason: str = None, anonymous: bool = False):
-    settings = get_guild_settings(interaction.guild_id)
+@bot.tree.command(name='setratelimit',
+                  description='Set how fast members can vote and suggest (Admin only)')
+@app_commands.describe(limit='The limit to change',
+                       rate='How many are allowed; 0 removes the limit, '
+                            'leave empty for the default')
+@app_commands.choices(limit=[
+    app_commands.Choice(name=limit.description, value=name)
+    for name, limit in RATE_LIMITS.items()
+])
+@app_commands.default_permissions(administrator=True)
+@instrumented('command')
+async def setratelimit(interaction: discord.Interaction,
+                       limit: app_commands.Choice[str],
+                       rate: app_commands.Range[int, 0, 100000] = None):
+    await set_rate_limit(interaction.guild_id, limit.value, rate)
+    if rate is None:
+        message = (f'✅ {limit.name} reset to the default of '
+                   f'{RATE_LIMITS[limit.value].default}.')
+    elif rate == 0:
+        message = f'✅ {limit.name} are no longer limited.'
+    else:
+        message = f'✅ {limit.name} limited to {rate}.'
+    await interaction.response.send_message(message, ephemeral=True)
+
+
+@bot.tree.command(name='ratelimits',
+                  description='Show how fast members can vote and suggest (Admin only)')
+@app_commands.default_permissions(administrator=True)
+@instrumented('command')
+async def ratelimits(interaction: discord.Interaction):
+    settings = await get_guild_settings(interaction.guild_id)
+    lines = []
+    for name, limit in RATE_LIMITS.items():
+        rate = rate_limit(settings, name)
+        lines.append(f'{limit.description}: {rate or "unlimited"}'
+                     + (' (default)' if getattr(settings, name, None) is None
+                        else ''))
+    await interaction.response.send_message('\n'.join(lines), ephemeral=True)
+
+
+@bot.tree.command(name='recountvotes',
+                  description='Rebuild vote tallies from recorded votes (Admin only)')
+@app_commands.default_permissions(administrator=True)
+@instrumented('command')
+async def recountvotes(interaction: discord.Interaction):
+    await vote_buffer.flush()
+    fixed = await recount_votes(interaction.guild_id)
+    await ranking_index.load([interaction.guild_id])
+    await interaction.response.send_message(
+        f'✅ Vote tallies recounted. Fixed {fixed} suggestion(s).',
+        ephemeral=True)
+
+
+# Background Discord work
+background_tasks = set()
+
+
+def spawn(coro, where):
+    """Run ``coro`` in the background, keeping a reference until it finishes."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+
+    def done(task):
+        background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            metrics.inc('errors_total', where=where)
+            print(f'Error in background {where} task: {task.exception()}')
+
+    task.add_done_callback(done)
+    return task
+
+
+async def with_retries(make_call, attempts=3, delay=1.0):
+    """Await ``make_call()``, retrying rate limits and Discord server errors."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return await make_call()
+        except discord.RateLimited as e:
+            if attempt == attempts:
+                raise
+            await asyncio.sleep(e.retry_after)
+        except discord.HTTPException as e:
+            if e.status < 500 or attempt == attempts:
+                raise
+            await asyncio.sleep(delay * attempt)
+
+
+async def fetch_thread(guild, thread_id):
+    if not thread_id:
+        return None
+    thread = guild.get_channel_or_thread(thread_id)
+    if thread is None:
+        try:
+            thread = await with_retries(lambda: guild.fetch_channel(thread_id))
+        except (discord.NotFound, discord.Forbidden):
+            return None
+    return thread if isinstance(thread, discord.Thread) else None
+
+
+class DecisionStyle(NamedTuple):
+    color: Callable[[], discord.Color]
+    field_name: str
+    decided_by: str
+    emoji: str
+
+
+# Every decision status goes through the same pipeline; adding a status
+# (e.g. 'implemented' or 'duplicate') only needs an entry here
+DECISION_STYLES = {
+    'approved': DecisionStyle(discord.Color.green, '✅ Approved', 'Approved by',
+                              '✅'),
+    'rejected': DecisionStyle(discord.Color.red, '❌ Rejected', 'Rejected by',
+                              '❌'),
+}
+
+
+async def publish_decision(guild, channel_id, suggestion, votes):
+    """Re-render a decided suggestion's message and lock its thread.
+
+    The embed is rebuilt from the database, so this costs one message edit
+    and one thread edit, plus a thread fetch if it is not cached.
+    """
+    # A queued results edit is superseded by this one
+    render_scheduler.discard(suggestion.suggestion_id)
+
+    embed, thread = await asyncio.gather(
+        render_suggestion(suggestion, votes, channel_id),
+        fetch_thread(guild, suggestion.thread_id))
+
+    metrics.inc('message_edits_total', source='decision')
+    message = suggestion_message(guild.id, channel_id, suggestion.message_id)
+    await with_retries(lambda: message.edit(embed=embed))
+
+    # Lock thread; a deleted thread has nothing left to lock
+    thread_locked = 1
+    if thread:
+        try:
+            await with_retries(
+                lambda: thread.edit(locked=True, archived=True))
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            # Left for reconcile_guild once the permission is fixed
+            thread_locked = None
+
+    await store_render_state(suggestion.suggestion_id, embed_hash(embed),
+                             thread_locked)
+
+
+async def check_reviewer(interaction: discord.Interaction):
+    """Return the guild's settings if the user may decide suggestions.
+
+    Otherwise tells the user why not and returns None.
+    """
+    settings = await get_guild_settings(interaction.guild_id)
 
     if not settings or not settings[1]:
         await interaction.response.send_message('❌ Reviewer role not set up.',
                                                 ephemeral=True)
-        return
+        return None
 
     reviewer_role = interaction.guild.get_role(settings[1])
     if not reviewer_role or reviewer_role not in interaction.user.roles:
@@ -609,64 +3608,55 @@ async def approve(interaction: discord.Interaction, suggestion_id: str,
             await interaction.response.send_message(
                 '❌ You need the reviewer role to use this command.',
                 ephemeral=True)
-            return
+            return None
 
-    suggestion = get_suggestion(suggestion_id)
-    if not suggestion:
-        await interaction.response.send_message('❌ Suggestion not found.',
-                                                ephemeral=True)
-        return
+    return settings
 
-    # Check if suggestion belongs to this guild
-    if suggestion[1] != interaction.guild_id:
-        await interaction.response.send_message(
-            '❌ Suggestion not found.',
-            ephemeral=True)
+
+async def decide(interaction: discord.Interaction, suggestion_id, status,
+                 reason, anonymous):
+    """Shared pipeline for every single-suggestion decision command."""
+    settings = await check_reviewer(interaction)
+    if not settings:
         return
 
-    update_suggestion_status(suggestion_id, 'approved', reason, anonymous)
+    # Everything past here may wait on the database or Discord
+    await interaction.response.defer(ephemeral=True, thinking=True)
 
-    channel = interaction.guild.get_channel(settings[0])
-    if channel:
-        try:
-            message = await channel.fetch_message(suggestion[3])
-            embed = message.embeds[0]
-            embed.color = discord.Color.green()
-
-            # Update Results label
-            for i, field in enumerate(embed.fields):
-                if field.name == 'Results so far:':
-                    votes = get_votes(suggestion_id)
-                    embed.set_field_at(
-                        i,
-                        name='Results:',
-                        value=f'Upvotes: {votes["upvote"]} ✅\nDownvotes: {votes["downvote"]} ❌',
-                        inline=False
-                    )
-                    break
-
-            approval_text = f'Approved by: {"Anonymous Reviewer" if anonymous else interaction.user.mention}'
-            if reason:
-                approval_text += f'\nReason: {reason}'
+    async with vote_buffer.reading():
+        delta = vote_buffer.pending_delta(suggestion_id)
+        suggestion = await update_suggestion_status(
+            suggestion_id, status, reason, anonymous, interaction.guild_id,
+            interaction.user.id)
+    # Only suggestions from this guild are updated
+    if not suggestion:
+        await interaction.followup.send('❌ Suggestion not found.',
+                                        ephemeral=True)
+        return
 
-            embed.add_field(name='✅ Approved', value=approval_text,
-                            inline=False)
+    # Reply before touching the thread: if the command was run inside it,
+    # archiving the thread first would fail the interaction
+    await interaction.followup.send(
+        f'{DECISION_STYLES[status].emoji} Suggestion `{suggestion_id}` {status}!',
+        ephemeral=True)
 
-            await message.edit(embed=embed)
+    channel_id = suggestion.channel_id or settings[0]
+    if channel_id and suggestion.message_id:
+        spawn(publish_decision(interaction.guild, channel_id, suggestion,
+                               suggestion.tallies(delta)),
+              status)
 
-            # Lock thread
-            if suggestion[4]:  # thread_id
-                try:
-                    thread = await channel.guild.fetch_channel(suggestion[4])
-                    if thread and isinstance(thread, discord.Thread):
-                        await thread.edit(locked=True, archived=True)
-                except (discord.NotFound, discord.Forbidden):
-                    pass
-        except Exception:
-            pass
 
-    await interaction.response.send_message(
-        f'✅ Suggestion `{suggestion_id}` approved!', ephemeral=True)
+@bot.tree.command(name='approve',
+                  description='Approve a suggestion (Reviewer only)')
+@app_commands.describe(
+    suggestion_id='The ID of the suggestion',
+    reason='Optional reason',
+    anonymous='Approve anonymously (hides your name)')
+@instrumented('command')
+async def approve(interaction: discord.Interaction, suggestion_id: str,
+                  reason: str = None, anonymous: bool = False):
+    await decide(interaction, suggestion_id, 'approved', reason, anonymous)
 
 
 @bot.tree.command(name='reject',
@@ -675,80 +3665,683 @@ async def approve(interaction: discord.Interaction, suggestion_id: str,
     suggestion_id='The ID of the suggestion',
     reason='Optional reason',
     anonymous='Reject anonymously (hides your name)')
+@instrumented('command')
 async def reject(interaction: discord.Interaction, suggestion_id: str,
                  reason: str = None, anonymous: bool = False):
-    settings = get_guild_settings(interaction.guild_id)
+    await decide(interaction, suggestion_id, 'rejected', reason, anonymous)
 
-    if not settings or not settings[1]:
-        await interaction.response.send_message('❌ Reviewer role not set up.',
-                                                ephemeral=True)
+
+def parse_suggestion_ids(text):
+    return list(dict.fromkeys(
+        part.strip().lower() for part in text.replace(',', ' ').split()))
+
+
+@bot.tree.command(name='bulkdecide',
+                  description='Approve or reject many pending suggestions at once (Reviewer only)')
+@app_commands.describe(
+    decision='Approve or reject the matching suggestions',
+    suggestion_ids='Suggestion IDs separated by spaces or commas',
+    older_than_days='Only suggestions submitted more than this many days ago',
+    max_score='Only suggestions whose net score (upvotes - downvotes) is below this',
+    reason='Optional reason',
+    anonymous='Decide anonymously (hides your name)')
+@app_commands.choices(decision=[
+    app_commands.Choice(name='Approve', value='approved'),
+    app_commands.Choice(name='Reject', value='rejected'),
+])
+@instrumented('command')
+async def bulkdecide(interaction: discord.Interaction,
+                     decision: app_commands.Choice[str],
+                     suggestion_ids: str = None,
+                     older_than_days: app_commands.Range[int, 0] = None,
+                     max_score: int = None, reason: str = None,
+                     anonymous: bool = False):
+    if suggestion_ids is None and older_than_days is None and max_score is None:
+        await interaction.response.send_message(
+            '❌ Give suggestion IDs or at least one filter.', ephemeral=True)
         return
 
-    reviewer_role = interaction.guild.get_role(settings[1])
-    if not reviewer_role or reviewer_role not in interaction.user.roles:
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                '❌ You need the reviewer role to use this command.',
-                ephemeral=True)
-            return
+    settings = await check_reviewer(interaction)
+    if not settings:
+        return
 
-    suggestion = get_suggestion(suggestion_id)
-    if not suggestion:
-        await interaction.response.send_message('❌ Suggestion not found.',
-                                                ephemeral=True)
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    status = decision.value
+    created_before = None
+    if older_than_days is not None:
+        created_before = (datetime.now(timezone.utc) -
+                          timedelta(days=older_than_days)).isoformat()
+
+    # max_score filters on the tallies in the database
+    await vote_buffer.flush()
+    async with vote_buffer.reading():
+        deltas = vote_buffer.pending_deltas()
+        decided = await store_bulk_decision(
+            interaction.guild_id, status, reason, anonymous,
+            interaction.user.id,
+            parse_suggestion_ids(suggestion_ids) if suggestion_ids else None,
+            created_before, max_score)
+    for suggestion in decided:
+        suggestion_cache.put(suggestion)
+        ranking_index.discard(suggestion.guild_id, suggestion.suggestion_id)
+
+    if not decided:
+        await interaction.followup.send(
+            '❌ No pending suggestions matched.', ephemeral=True)
         return
 
-    # Check if suggestion belongs to this guild
-    if suggestion[1] != interaction.guild_id:
+    summary = f'Suggestion(s) {status}: {len(decided)}.'
+    decided = [suggestion for suggestion in decided if suggestion.message_id]
+    if not settings[0] or not decided:
+        await interaction.followup.send(f'✅ {summary}', ephemeral=True)
+        return
+
+    await interaction.edit_original_response(
+        content=f'⏳ {summary} Updating messages: 0/{len(decided)}')
+
+    pool = asyncio.Semaphore(BULK_CONCURRENCY)
+    done = 0
+    failed = 0
+
+    async def publish(suggestion):
+        nonlocal done, failed
+        async with pool:
+            try:
+                await publish_decision(
+                    interaction.guild, suggestion.channel_id or settings[0],
+                    suggestion,
+                    suggestion.tallies(deltas.get(suggestion.suggestion_id)))
+            except Exception as e:
+                failed += 1
+                metrics.inc('errors_total', where='bulkdecide')
+                print(f'Error updating {status} suggestion '
+                      f'{suggestion.suggestion_id}: {e}')
+        done += 1
+        if done % 10 == 0 and done < len(decided):
+            try:
+                await interaction.edit_original_response(
+                    content=f'⏳ {summary} Updating messages: '
+                            f'{done}/{len(decided)}')
+            except discord.HTTPException:
+                pass
+
+    await asyncio.gather(*(publish(suggestion) for suggestion in decided))
+
+    result = f'✅ {summary} Updated {done - failed}/{len(decided)} message(s).'
+    if failed:
+        result += f' {failed} could not be updated.'
+    await interaction.edit_original_response(content=result)
+
+
+SEARCH_PAGE_SIZE = 5
+
+
+def search_results_embed(query, results, deltas, total, page, page_count):
+    embed = discord.Embed(title=f'🔎 Suggestions matching "{query[:200]}"',
+                          color=discord.Color.blurple())
+    for result in results:
+        delta = deltas.get(result.suggestion_id, {'upvote': 0, 'downvote': 0})
+        style = DECISION_STYLES.get(result.status)
+        details = [f'`{result.suggestion_id}`',
+                   f'▲ {result.upvotes + delta["upvote"]} '
+                   f'▼ {result.downvotes + delta["downvote"]}']
+        link = message_link(result.guild_id, result.channel_id,
+                            result.message_id)
+        if link:
+            details.append(f'[Jump to suggestion]({link})')
+        embed.add_field(
+            name=f'{style.emoji if style else "🕒"} {result.title}'[:256],
+            value=f'{result.snippet}\n{" · ".join(details)}'[:1024],
+            inline=False)
+    embed.set_footer(text=f'Page {page + 1}/{page_count} · {total} match(es)')
+    return embed
+
+
+@bot.tree.command(name='search', description="Search this server's suggestions")
+@app_commands.describe(
+    query='Words to look for in titles, descriptions, pros and cons',
+    status='Only show suggestions with this status')
+@app_commands.choices(status=[
+    app_commands.Choice(name='Pending', value='pending'),
+    app_commands.Choice(name='Approved', value='approved'),
+    app_commands.Choice(name='Rejected', value='rejected'),
+])
+@instrumented('command')
+async def search(interaction: discord.Interaction, query: str,
+                 status: app_commands.Choice[str] = None):
+    if not fts_query(query):
         await interaction.response.send_message(
-            '❌ Suggestion not found.',
-            ephemeral=True)
+            '❌ Give at least one word to search for.', ephemeral=True)
+        return
+
+    status = status.value if status else None
+
+    async def render_page(page):
+        async with vote_buffer.reading():
+            deltas = vote_buffer.pending_deltas()
+            total, results = await search_suggestions(
+                interaction.guild_id, query, status, SEARCH_PAGE_SIZE,
+                page * SEARCH_PAGE_SIZE)
+        page_count = -(-total // SEARCH_PAGE_SIZE)
+        return (search_results_embed(query, results, deltas, total, page,
+                                     page_count),
+                page_count)
+
+    embed, page_count = await render_page(0)
+    if not page_count:
+        await interaction.response.send_message(
+            '🔎 No suggestions matched.', ephemeral=True)
+        return
+
+    await interaction.response.send_message(
+        embed=embed,
+        view=PagerView(interaction.user.id, render_page, page_count),
+        ephemeral=True)
+
+
+RANKING_PAGE_SIZE = 10
+RANKING_TITLES = {
+    'top': '🏆 Top suggestions',
+    'trending': '🔥 Trending suggestions',
+    'controversial': '⚖️ Most controversial suggestions',
+    'oldest': '🕰️ Oldest pending suggestions',
+}
+
+
+def ranking_embed(guild_id, sort, entries, total, page, page_count):
+    embed = discord.Embed(title=RANKING_TITLES[sort],
+                          color=discord.Color.gold())
+    for rank, entry in enumerate(entries, start=page * RANKING_PAGE_SIZE + 1):
+        details = [f'`{entry.suggestion_id}`',
+                   f'▲ {entry.upvotes} ▼ {entry.downvotes}']
+        if sort == 'trending':
+            details.append(f'🔥 {ranking_index.trending(entry):.1f}')
+        elif sort == 'oldest':
+            details.append(f'<t:{int(created_timestamp(entry.created_at))}:R>')
+        link = message_link(guild_id, entry.channel_id, entry.message_id)
+        if link:
+            details.append(f'[Jump to suggestion]({link})')
+        embed.add_field(name=f'{rank}. {entry.title}'[:256],
+                        value=' · '.join(details), inline=False)
+    embed.set_footer(
+        text=f'Page {page + 1}/{page_count} · {total} pending suggestion(s)')
+    return embed
+
+
+async def send_ranking(interaction, sort):
+    guild_id = interaction.guild_id
+
+    async def render_page(page):
+        entries, total = ranking_index.page(guild_id, sort, page,
+                                            RANKING_PAGE_SIZE)
+        page_count = -(-total // RANKING_PAGE_SIZE)
+        return (ranking_embed(guild_id, sort, entries, total, page,
+                              page_count),
+                page_count)
+
+    embed, page_count = await render_page(0)
+    if not page_count:
+        await interaction.response.send_message(
+            '📭 There are no pending suggestions.', ephemeral=True)
         return
 
-    update_suggestion_status(suggestion_id, 'rejected', reason, anonymous)
+    await interaction.response.send_message(
+        embed=embed,
+        view=PagerView(interaction.user.id, render_page, page_count),
+        ephemeral=True)
+
 
-    channel = interaction.guild.get_channel(settings[0])
-    if channel:
+@bot.tree.command(name='top', description='Pending suggestions with the best net score')
+@instrumented('command')
+async def top(interaction: discord.Interaction):
+    await send_ranking(interaction, 'top')
+
+
+@bot.tree.command(name='trending', description='Pending suggestions gaining votes fastest')
+@instrumented('command')
+async def trending(interaction: discord.Interaction):
+    await send_ranking(interaction, 'trending')
+
+
+@bot.tree.command(name='list', description='List pending suggestions')
+@app_commands.describe(sort='How to order the suggestions')
+@app_commands.choices(sort=[
+    app_commands.Choice(name='Top', value='top'),
+    app_commands.Choice(name='Trending', value='trending'),
+    app_commands.Choice(name='Controversial', value='controversial'),
+    app_commands.Choice(name='Oldest', value='oldest'),
+])
+@instrumented('command')
+async def list_suggestions(interaction: discord.Interaction,
+                           sort: app_commands.Choice[str] = None):
+    await send_ranking(interaction, sort.value if sort else 'top')
+
+
+# Reconciliation
+# Repair drifted messages and threads as each shard comes up
+RECONCILE_ON_STARTUP = os.getenv("RECONCILE_ON_STARTUP", "").lower() in (
+    "1", "true", "yes")
+# Suggestions repaired at once, and Discord requests started per second, by
+# all reconcile runs in this process together
+RECONCILE_CONCURRENCY = int(os.getenv("RECONCILE_CONCURRENCY", "4"))
+RECONCILE_RATE = float(os.getenv("RECONCILE_RATE", "2"))
+RECONCILE_PAGE_SIZE = 200
+# Stored as the rendered hash of a message that was deleted
+MESSAGE_MISSING = 'missing'
+
+
+class RateBudget:
+    """Spaces calls out so that at most ``rate`` start per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = 0.0
+
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+reconcile_budget = RateBudget(RECONCILE_RATE)
+reconcile_slots = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+reconciling = set()
+reconciled_shards = set()
+
+
+async def reconcile_message(guild, channel_id, suggestion, tallies, embed):
+    """Edit a suggestion message to ``embed``; returns the embed's hash."""
+    if missing_message_details(suggestion):
+        # Posted or decided before the author and reviewer were stored;
+        # copy them off the message and render again
+        await reconcile_budget.wait()
+        suggestion = await load_suggestion(suggestion.suggestion_id,
+                                           channel_id)
+        embed = render_suggestion_embed(suggestion, tallies,
+                                        suggestion.decision())
+
+    await reconcile_budget.wait()
+    message = suggestion_message(guild.id, channel_id, suggestion.message_id)
+    metrics.inc('message_edits_total', source='reconcile')
+    await with_retries(lambda: message.edit(embed=embed))
+    return embed_hash(embed)
+
+
+async def reconcile_suggestion(guild, state, delta, counts):
+    suggestion = state.suggestion
+    tallies = {'upvote': state.upvotes + delta['upvote'],
+               'downvote': state.downvotes + delta['downvote']}
+    embed = render_suggestion_embed(suggestion, tallies, suggestion.decision())
+    rendered_hash = embed_hash(embed)
+    counts['checked'] += 1
+
+    edit = state.rendered_hash not in (rendered_hash, MESSAGE_MISSING)
+    lock = (suggestion.status != 'pending' and suggestion.thread_id
+            and not state.thread_locked)
+    if not edit and not lock:
+        return
+
+    settings = await get_guild_settings(guild.id)
+    channel_id = suggestion.channel_id or (settings and
+                                           settings.suggestion_channel_id)
+    stored_hash = thread_locked = None
+    async with reconcile_slots:
         try:
-            message = await channel.fetch_message(suggestion[3])
-            embed = message.embeds[0]
-            embed.color = discord.Color.red()
-
-            # Update Results label
-            for i, field in enumerate(embed.fields):
-                if field.name == 'Results so far:':
-                    votes = get_votes(suggestion_id)
-                    embed.set_field_at(
-                        i,
-                        name='Results:',
-                        value=f'Upvotes: {votes["upvote"]} ✅\nDownvotes: {votes["downvote"]} ❌',
-                        inline=False
-                    )
+            if edit:
+                try:
+                    stored_hash = await reconcile_message(
+                        guild, channel_id, suggestion, tallies, embed)
+                except discord.NotFound:
+                    # Deleted; remember it so later runs don't try again
+                    stored_hash = MESSAGE_MISSING
+                    counts['missing'] += 1
+                else:
+                    counts['edited'] += 1
+
+            if lock:
+                await reconcile_budget.wait()
+                thread = await fetch_thread(guild, suggestion.thread_id)
+                if thread and not (thread.locked and thread.archived):
+                    await reconcile_budget.wait()
+                    await with_retries(
+                        lambda: thread.edit(locked=True, archived=True))
+                    counts['locked'] += 1
+                thread_locked = 1
+        except discord.NotFound:
+            # The thread was deleted; nothing left to lock
+            thread_locked = 1
+        except discord.HTTPException as e:
+            counts['failed'] += 1
+            print(f'Error reconciling suggestion {suggestion.suggestion_id}: {e}')
+
+    if stored_hash or thread_locked:
+        await store_render_state(suggestion.suggestion_id, stored_hash,
+                                 thread_locked)
+
+
+async def reconcile_guild(guild_id):
+    """Bring a guild's suggestion messages and threads in line with the database.
+
+    Walks its suggestions a page at a time and compares each one's rendered
+    embed with the hash stored by the last edit, so only messages that
+    drifted (e.g. decided or voted on while the bot was down) are edited,
+    and only decided suggestions whose thread is still open are locked.
+    Returns counts of suggestions checked, edited, locked, missing and failed.
+    """
+    counts = defaultdict(int)
+    guild = bot.get_guild(guild_id)
+    if guild is None or guild_id in reconciling:
+        return counts
+
+    reconciling.add(guild_id)
+    try:
+        with metrics.time('reconcile_seconds'):
+            after = ''
+            while True:
+                async with vote_buffer.reading():
+                    deltas = vote_buffer.pending_deltas()
+                    page = await load_render_states(guild_id, after,
+                                                    RECONCILE_PAGE_SIZE)
+                if not page:
                     break
+                after = page[-1].suggestion.suggestion_id
+                await asyncio.gather(*(
+                    reconcile_suggestion(
+                        guild, state,
+                        deltas.get(state.suggestion.suggestion_id,
+                                   {'upvote': 0, 'downvote': 0}),
+                        counts)
+                    for state in page))
+    finally:
+        reconciling.discard(guild_id)
+
+    for action in ('edited', 'locked', 'missing', 'failed'):
+        if counts[action]:
+            metrics.inc('reconciled_total', counts[action], action=action)
+    return counts
+
+
+async def reconcile_shard(shard_id):
+    totals = defaultdict(int)
+    for guild in bot.guilds:
+        if guild.shard_id == shard_id:
+            for action, count in (await reconcile_guild(guild.id)).items():
+                totals[action] += count
+    print(f'Shard {shard_id} reconciled {totals["checked"]} suggestion(s): '
+          f'{totals["edited"]} edited, {totals["locked"]} thread(s) locked, '
+          f'{totals["failed"]} failed')
+
+
+@bot.tree.command(name='reconcile',
+                  description='Repair suggestion messages and threads that are out of date (Admin only)')
+@app_commands.default_permissions(administrator=True)
+@instrumented('command')
+async def reconcile(interaction: discord.Interaction):
+    if interaction.guild_id in reconciling:
+        await interaction.response.send_message(
+            '⏳ A reconcile is already running for this server.',
+            ephemeral=True)
+        return
 
-            rejection_text = f'Rejected by: {"Anonymous Reviewer" if anonymous else interaction.user.mention}'
-            if reason:
-                rejection_text += f'\nReason: {reason}'
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    await vote_buffer.flush()
+    counts = await reconcile_guild(interaction.guild_id)
+    message = (f'✅ Checked {counts["checked"]} suggestion(s): edited '
+               f'{counts["edited"]} message(s) and locked {counts["locked"]} '
+               'thread(s).')
+    if counts['missing'] or counts['failed']:
+        message += (f' {counts["missing"]} message(s) were deleted and '
+                    f'{counts["failed"]} could not be updated.')
+    await interaction.followup.send(message, ephemeral=True)
+
+
+# Export and import
+# Rows fetched and written, or read and inserted, per batch
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = {
+    'suggestions': Suggestion._fields + ('upvotes', 'downvotes'),
+    'votes': ('suggestion_id', 'user_id', 'vote_type'),
+}
+# Read back as text from CSV
+INTEGER_COLUMNS = {'guild_id', 'user_id', 'channel_id', 'message_id',
+                   'thread_id', 'decided_anonymously', 'decided_by', 'version'}
+# For migrated rows that leave these out
+IMPORT_DEFAULTS = {'pros': '', 'cons': '', 'status': 'pending',
+                   'decided_anonymously': 0, 'version': 0}
+
+
+def export_query(table, dialect):
+    guild = '$1' if dialect == 'postgres' else '?'
+    if table == 'suggestions':
+        return (f'SELECT {", ".join(EXPORT_COLUMNS[table])} FROM suggestions '
+                f'WHERE guild_id = {guild}')
+    if dialect == 'postgres':
+        return f'''SELECT v.suggestion_id, v.user_id, v.vote_type
+                   FROM suggestions s
+                   JOIN votes v ON v.suggestion_id = s.suggestion_id
+                   WHERE s.guild_id = {guild}'''
+    return f'''SELECT s.suggestion_id, v.user_id,
+                      CASE v.vote WHEN 1 THEN 'upvote' ELSE 'downvote' END
+               FROM suggestions s
+               JOIN votes v ON v.suggestion_key = s.suggestion_key
+               WHERE s.guild_id = {guild}'''
+
+
+def row_writer(f, file_format, columns):
+    """A function appending batches of rows to ``f`` as CSV or JSON lines."""
+    if file_format == 'csv':
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        return writer.writerows
+
+    def write(rows):
+        f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False)
+                     + '\n' for row in rows)
+
+    return write
+
+
+async def export_guild(guild_id, file_format, directory):
+    """Stream a guild's suggestions and votes into gzipped files.
+
+    Rows are written a batch at a time on a worker thread, so memory stays
+    flat however large the guild is. Returns the paths written.
+    """
+    paths = []
+    for table, columns in EXPORT_COLUMNS.items():
+        path = os.path.join(directory, f'{guild_id}-{table}.{file_format}.gz')
+        with gzip.open(path, 'wt', compresslevel=6, encoding='utf-8',
+                       newline='') as f:
+            write = row_writer(f, file_format, columns)
+            async for rows in db.batches(export_query(table, db.dialect),
+                                         (guild_id,), EXPORT_BATCH_SIZE):
+                await asyncio.to_thread(write, rows)
+        paths.append(path)
+    return paths
+
+
+def read_rows(path):
+    """Yield dicts from a CSV or JSON lines file, gzipped if it ends in .gz."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        if '.csv' in os.path.basename(path):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def export_table(path):
+    """Whether a file holds suggestions or votes, judging by its first row."""
+    for row in read_rows(path):
+        return 'votes' if 'title' not in row else 'suggestions'
+    return None
+
+
+def imported_suggestion(row, guild_id=None):
+    """The Suggestion for an exported row, or None if it lacks required fields."""
+    values = dict(IMPORT_DEFAULTS,
+                  created_at=datetime.now(timezone.utc).isoformat())
+    for column in Suggestion._fields:
+        value = row.get(column)
+        if value is not None and value != '':
+            values[column] = int(value) if column in INTEGER_COLUMNS else value
+    if guild_id:
+        # Its message and thread stay in the server it was exported from
+        values.update(guild_id=guild_id, channel_id=None, message_id=None,
+                      thread_id=None)
+    if not all(values.get(column) for column in
+               ('suggestion_id', 'guild_id', 'title', 'description')):
+        return None
+    return Suggestion(**{column: values.get(column)
+                         for column in Suggestion._fields})
+
+
+def imported_vote(row, imported):
+    vote = row.get('vote_type')
+    if (vote not in ('upvote', 'downvote')
+            or row.get('suggestion_id') not in imported):
+        return None
+    return row['suggestion_id'], int(row['user_id']), vote
+
+
+async def import_file(path, imported, guild_id=None):
+    """Load one exported file in batched transactions.
+
+    Suggestions that already exist are left alone, and the IDs inserted are
+    added to ``imported``. Votes are only loaded for those, so a vote never
+    lands on an unrelated suggestion that happens to share its ID; each one
+    overwrites the user's current vote and updates the tallies.
+    Returns (loaded, skipped).
+    """
+    if export_table(path) == 'votes':
+        convert = functools.partial(imported_vote, imported=imported)
+
+        async def store(votes):
+            await write_votes(votes)
+            return len(votes)
+    else:
+        convert = functools.partial(imported_suggestion, guild_id=guild_id)
+
+        async def store(suggestions):
+            inserted = await import_suggestions(suggestions)
+            imported.update(inserted)
+            return len(inserted)
+
+    loaded = skipped = 0
+    batch = []
+    for row in read_rows(path):
+        try:
+            item = convert(row)
+        except (TypeError, ValueError):
+            item = None
+        if item is None:
+            skipped += 1
+            continue
+        batch.append(item)
+        if len(batch) == EXPORT_BATCH_SIZE:
+            stored = await store(batch)
+            loaded += stored
+            skipped += len(batch) - stored
+            batch = []
+    if batch:
+        stored = await store(batch)
+        loaded += stored
+        skipped += len(batch) - stored
+    return loaded, skipped
+
+
+@bot.tree.command(name='export',
+                  description="Download this server's suggestions and votes (Admin only)")
+@app_commands.describe(file_format='File format (default CSV)')
+@app_commands.rename(file_format='format')
+@app_commands.choices(file_format=[
+    app_commands.Choice(name='CSV', value='csv'),
+    app_commands.Choice(name='JSON lines', value='jsonl'),
+])
+@app_commands.default_permissions(administrator=True)
+@instrumented('command')
+async def export(interaction: discord.Interaction,
+                 file_format: app_commands.Choice[str] = None):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    await vote_buffer.flush()
+    with tempfile.TemporaryDirectory(prefix='suggestions-export-') as directory:
+        with metrics.time('export_seconds'):
+            paths = await export_guild(
+                interaction.guild_id,
+                file_format.value if file_format else 'csv', directory)
+
+        size = sum(os.path.getsize(path) for path in paths)
+        if size > interaction.guild.filesize_limit:
+            await interaction.followup.send(
+                f'❌ The export is {size / 1_000_000:.1f} MB, over this '
+                "server's upload limit. Ask the bot's host to run "
+                f'`python main.py export {interaction.guild_id}`.',
+                ephemeral=True)
+            return
 
-            embed.add_field(name='❌ Rejected', value=rejection_text,
-                            inline=False)
+        await interaction.followup.send(
+            '📦 Suggestions and votes for this server:',
+            files=[discord.File(path) for path in paths], ephemeral=True)
 
-            await message.edit(embed=embed)
 
-            # Lock thread
-            if suggestion[4]:  # thread_id
-                try:
-                    thread = await channel.guild.fetch_channel(suggestion[4])
-                    if thread and isinstance(thread, discord.Thread):
-                        await thread.edit(locked=True, archived=True)
-                except (discord.NotFound, discord.Forbidden):
-                    pass
-        except Exception:
-            pass
+def parse_cli_args():
+    parser = argparse.ArgumentParser(
+        description='Constellia suggestions bot. Runs the bot unless given '
+                    'a command.')
+    subparsers = parser.add_subparsers(dest='command')
 
-    await interaction.response.send_message(
-        f'❌ Suggestion `{suggestion_id}` rejected!', ephemeral=True)
+    export_parser = subparsers.add_parser(
+        'export', help="write a guild's suggestions and votes to gzipped files")
+    export_parser.add_argument('guild_id', type=int)
+    export_parser.add_argument('--format', dest='file_format',
+                               choices=('csv', 'jsonl'), default='csv')
+    export_parser.add_argument('--output', default='.',
+                               help='directory to write the files to')
+
+    import_parser = subparsers.add_parser(
+        'import', help='load suggestions and votes from exported files')
+    import_parser.add_argument('files', nargs='+')
+    import_parser.add_argument(
+        '--guild', type=int,
+        help="import suggestions into this guild instead of the file's")
+    return parser.parse_args()
+
+
+async def run_cli(cli_args):
+    await db.open()
+    try:
+        if cli_args.command == 'export':
+            for path in await export_guild(cli_args.guild_id,
+                                           cli_args.file_format,
+                                           cli_args.output):
+                print(f'Wrote {path}')
+        else:
+            # Suggestions first: votes are only loaded for suggestions
+            # inserted by this run
+            files = sorted(cli_args.files,
+                           key=lambda path: export_table(path) == 'votes')
+            imported = set()
+            for path in files:
+                loaded, skipped = await import_file(path, imported,
+                                                    cli_args.guild)
+                print(f'{path}: loaded {loaded} row(s), skipped {skipped}')
+    finally:
+        await db.close()
 
 
 # Run bot
-bot.run(TOKEN)
+if __name__ == '__main__':
+    cli_args = parse_cli_args()
+    if cli_args.command:
+        asyncio.run(run_cli(cli_args))
+    else:
+        if not TOKEN:
+            raise ValueError("DISCORD_TOKEN not found in .env file")
+        # SuggestionsBot.close flushes votes and closes the database
+        bot.run(TOKEN)
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# main.py reads its configuration at import time. Nothing is written to
+# these paths: each test opens its own database under tmp_path.
+scratch = Path(tempfile.gettempdir())
+os.environ['DISCORD_TOKEN'] = 'test'
+os.environ['DATABASE_URL'] = ''
+os.environ['DB_PATH'] = str(scratch / 'suggestions-test.db')
+os.environ['VOTE_JOURNAL_PATH'] = str(scratch / 'suggestions-test-journal')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """A migrated SQLite database used by every db_helper in the test."""
+    storage = main.SQLiteStorage(str(tmp_path / 'suggestions.db'))
+    monkeypatch.setattr(main, 'db', storage)
+    asyncio.run(storage.open())
+    yield storage
+    asyncio.run(storage.close())
+
+
+def make_suggestion(suggestion_id, guild_id=1, **fields):
+    values = dict(
+        suggestion_id=suggestion_id, guild_id=guild_id, user_id=100,
+        channel_id=None, message_id=None, thread_id=None,
+        title=f'Suggestion {suggestion_id}', description='Description',
+        pros='', cons='', image_url=None, status='pending',
+        created_at='2025-01-01T00:00:00+00:00', decision_reason=None,
+        decided_anonymously=0, decided_by=None, author_name=None,
+        author_icon_url=None, version=0)
+    values.update(fields)
+    return main.Suggestion(**values)
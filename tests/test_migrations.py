@@ -0,0 +1,150 @@
+import sqlite3
+
+import pytest
+
+import main
+
+# The schema init_db created before migrations were versioned
+BASELINE_SCHEMA = '''
+CREATE TABLE guild_settings
+(
+    guild_id INTEGER PRIMARY KEY,
+    suggestion_channel_id INTEGER,
+    reviewer_role_id INTEGER,
+    blocked_role_id INTEGER
+);
+CREATE TABLE suggestions
+(
+    suggestion_id TEXT PRIMARY KEY,
+    guild_id INTEGER,
+    user_id INTEGER,
+    message_id INTEGER,
+    thread_id INTEGER,
+    title TEXT,
+    description TEXT,
+    pros TEXT,
+    cons TEXT,
+    image_url TEXT,
+    status TEXT DEFAULT 'pending',
+    created_at TEXT,
+    decision_reason TEXT,
+    decided_anonymously INTEGER DEFAULT 0
+);
+CREATE TABLE votes
+(
+    suggestion_id TEXT,
+    user_id INTEGER,
+    vote_type TEXT,
+    PRIMARY KEY (suggestion_id, user_id)
+);
+'''
+
+# Older databases predate these columns; migrate_base_schema adds them
+LEGACY_SCHEMA = (BASELINE_SCHEMA
+                 .replace('reviewer_role_id INTEGER,\n    blocked_role_id INTEGER',
+                          'reviewer_role_id INTEGER')
+                 .replace('    thread_id INTEGER,\n', '')
+                 .replace(',\n    decided_anonymously INTEGER DEFAULT 0', ''))
+
+SUGGESTIONS = [
+    ('abc', 1, 10, 100, 'Dark mode', 'Add a dark theme', 'approved'),
+    ('def', 1, 11, 101, 'Music channel', 'A channel for sharing songs',
+     'pending'),
+    ('ghi', 2, 12, 102, 'Weekly events', 'Game nights every Friday',
+     'rejected'),
+]
+
+VOTES = [
+    ('abc', 20, 'upvote'),
+    ('abc', 21, 'upvote'),
+    ('abc', 22, 'downvote'),
+    ('def', 20, 'downvote'),
+    # Left behind by a deleted suggestion
+    ('zzz', 20, 'upvote'),
+]
+
+
+def baseline_database(path, schema=BASELINE_SCHEMA):
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.execute('INSERT INTO guild_settings (guild_id, suggestion_channel_id) '
+                 'VALUES (1, 500)')
+    conn.executemany(
+        '''INSERT INTO suggestions (suggestion_id, guild_id, user_id, message_id,
+                                    title, description, pros, cons, status,
+                                    created_at)
+           VALUES (?, ?, ?, ?, ?, ?, '', '', ?, '2024-01-01T00:00:00+00:00')''',
+        SUGGESTIONS)
+    conn.executemany('INSERT INTO votes VALUES (?, ?, ?)', VOTES)
+    conn.commit()
+    return conn
+
+
+@pytest.mark.parametrize('schema', [BASELINE_SCHEMA, LEGACY_SCHEMA],
+                         ids=['baseline', 'legacy'])
+def test_migrate_upgrades_existing_database(tmp_path, schema):
+    conn = baseline_database(tmp_path / 'suggestions.db', schema)
+
+    assert main.migrate(conn) == len(main.MIGRATIONS)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(
+        main.MIGRATIONS)
+    assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+
+    tallies = conn.execute(
+        'SELECT suggestion_id, upvotes, downvotes FROM suggestions '
+        'ORDER BY suggestion_id').fetchall()
+    assert tallies == [('abc', 2, 1), ('def', 0, 1), ('ghi', 0, 0)]
+
+    votes = conn.execute(
+        '''SELECT s.suggestion_id, v.user_id, v.vote
+           FROM votes v JOIN suggestions s ON s.suggestion_key = v.suggestion_key
+           ORDER BY 1, 2''').fetchall()
+    assert votes == [('abc', 20, 1), ('abc', 21, 1), ('abc', 22, 0),
+                     ('def', 20, 0)]
+    assert conn.execute('SELECT COUNT(*) FROM votes').fetchone()[0] == 4
+
+    hits = conn.execute(
+        '''SELECT s.suggestion_id FROM suggestions_fts
+           JOIN suggestions s ON s.suggestion_key = suggestions_fts.rowid
+           WHERE suggestions_fts MATCH ?''', ('songs',)).fetchall()
+    assert hits == [('def',)]
+
+    settings = conn.execute(
+        'SELECT suggestion_channel_id, blocked_role_id, vote_rate_limit '
+        'FROM guild_settings WHERE guild_id = 1').fetchone()
+    assert settings == (500, None, None)
+
+
+def test_migrated_triggers_keep_tallies(tmp_path):
+    conn = baseline_database(tmp_path / 'suggestions.db')
+    main.migrate(conn)
+
+    with conn:
+        conn.execute(
+            '''INSERT INTO votes SELECT suggestion_key, 23, 1 FROM suggestions
+               WHERE suggestion_id = ?''', ('ghi',))
+        conn.execute(
+            '''UPDATE votes SET vote = 1 WHERE user_id = 22 AND suggestion_key =
+               (SELECT suggestion_key FROM suggestions WHERE suggestion_id = ?)''',
+            ('abc',))
+        conn.execute(
+            'UPDATE suggestions SET title = ? WHERE suggestion_id = ?',
+            ('Playlist channel', 'def'))
+
+    tallies = conn.execute(
+        'SELECT suggestion_id, upvotes, downvotes FROM suggestions '
+        'ORDER BY suggestion_id').fetchall()
+    assert tallies == [('abc', 3, 0), ('def', 0, 1), ('ghi', 1, 0)]
+    assert conn.execute(
+        "SELECT rowid FROM suggestions_fts WHERE suggestions_fts MATCH 'playlist'"
+    ).fetchall()
+
+
+def test_migrate_is_idempotent(tmp_path):
+    conn = baseline_database(tmp_path / 'suggestions.db')
+    main.migrate(conn)
+    schema = conn.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall()
+
+    assert main.migrate(conn) == len(main.MIGRATIONS)
+    assert conn.execute(
+        'SELECT sql FROM sqlite_master ORDER BY name').fetchall() == schema
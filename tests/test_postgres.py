@@ -0,0 +1,162 @@
+"""The PostgreSQL helpers, run when TEST_DATABASE_URL names a database.
+
+Each test works in a schema of its own, dropped afterwards.
+"""
+import asyncio
+import os
+import secrets
+
+import pytest
+
+import main
+from conftest import make_suggestion
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason='set TEST_DATABASE_URL to a PostgreSQL database')
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    """Runs ``scenario()`` against a PostgresStorage on a scratch schema."""
+    asyncpg = pytest.importorskip('asyncpg')
+    schema = f'suggestions_test_{secrets.token_hex(4)}'
+
+    async def execute(sql):
+        conn = await asyncpg.connect(TEST_DATABASE_URL)
+        try:
+            await conn.execute(sql)
+        finally:
+            await conn.close()
+
+    # Unknown query parameters become server settings for every connection
+    separator = '&' if '?' in TEST_DATABASE_URL else '?'
+    url = f'{TEST_DATABASE_URL}{separator}search_path={schema}'
+
+    def run(scenario):
+        async def wrapper():
+            storage = main.PostgresStorage(url)
+            monkeypatch.setattr(main, 'db', storage)
+            await storage.open()
+            try:
+                return await scenario(storage)
+            finally:
+                await storage.close()
+
+        return asyncio.run(wrapper())
+
+    asyncio.run(execute(f'CREATE SCHEMA {schema}'))
+    yield run
+    asyncio.run(execute(f'DROP SCHEMA {schema} CASCADE'))
+
+
+def test_migrate_postgres(postgres):
+    async def scenario(storage):
+        async with storage._pool.acquire() as conn:
+            version = await conn.fetchval('SELECT version FROM schema_version')
+            # Already up to date: a second run applies nothing
+            return version, await main.migrate_postgres(conn)
+
+    assert postgres(scenario) == (len(main.POSTGRES_MIGRATIONS),
+                                  len(main.POSTGRES_MIGRATIONS))
+
+
+def test_toggle_vote(postgres):
+    async def scenario(storage):
+        await main.save_suggestion(make_suggestion('abc'))
+        return [
+            await main.toggle_vote('abc', 10, 'upvote'),
+            await main.toggle_vote('abc', 11, 'upvote'),
+            await main.toggle_vote('abc', 10, 'downvote'),
+            await main.toggle_vote('abc', 11, 'upvote'),
+            await main.toggle_vote('missing', 10, 'upvote'),
+        ]
+
+    assert postgres(scenario) == [
+        (None, 'upvote', {'upvote': 1, 'downvote': 0}),
+        (None, 'upvote', {'upvote': 2, 'downvote': 0}),
+        ('upvote', 'downvote', {'upvote': 1, 'downvote': 1}),
+        ('upvote', None, {'upvote': 0, 'downvote': 1}),
+        (None, None, {'upvote': 0, 'downvote': 0}),
+    ]
+
+
+def test_write_votes(postgres):
+    async def scenario(storage):
+        await main.save_suggestion(make_suggestion('abc'))
+        await main.save_suggestion(make_suggestion('def'))
+        await main.write_votes([('abc', 10, 'upvote'), ('abc', 11, 'upvote'),
+                                ('def', 10, 'downvote')])
+        await main.write_votes([('abc', 10, 'downvote'), ('abc', 11, None)])
+        return (await main.get_vote_state('abc', 10),
+                await main.get_vote_state('abc', 11),
+                await main.get_votes('def'),
+                await main.recount_votes())
+
+    assert postgres(scenario) == (
+        ('downvote', {'upvote': 0, 'downvote': 1}),
+        (None, {'upvote': 0, 'downvote': 1}),
+        {'upvote': 0, 'downvote': 1},
+        0)
+
+
+def test_store_bulk_decision(postgres):
+    async def scenario(storage):
+        await main.save_suggestion(make_suggestion(
+            'old', created_at='2024-01-01T00:00:00+00:00'))
+        await main.save_suggestion(make_suggestion(
+            'new', created_at='2025-06-01T00:00:00+00:00'))
+        await main.save_suggestion(make_suggestion(
+            'liked', created_at='2024-01-01T00:00:00+00:00'))
+        await main.save_suggestion(make_suggestion(
+            'other', guild_id=2, created_at='2024-01-01T00:00:00+00:00'))
+        await main.write_votes([('liked', 10, 'upvote')])
+
+        decided = await main.store_bulk_decision(
+            1, 'rejected', 'Stale', False, 99, None,
+            '2025-01-01T00:00:00+00:00', 1)
+        by_id = await main.store_bulk_decision(
+            1, 'approved', None, True, 99, ['new', 'old', 'other'])
+        rows = [await main.get_suggestion(suggestion_id)
+                for suggestion_id in ('old', 'new', 'liked', 'other')]
+        return decided, by_id, rows
+
+    decided, by_id, rows = postgres(scenario)
+    assert [(record.suggestion_id, record.status, record.version)
+            for record in decided] == [('old', 'rejected', 1)]
+    # Already decided and other guilds' suggestions are left alone
+    assert [record.suggestion_id for record in by_id] == ['new']
+    assert [(row.status, row.decision_reason, row.decided_anonymously,
+             row.decided_by) for row in rows] == [
+        ('rejected', 'Stale', 0, 99),
+        ('approved', None, 1, 99),
+        ('pending', None, 0, None),
+        ('pending', None, 0, None),
+    ]
+
+
+def test_search_suggestions(postgres):
+    async def scenario(storage):
+        await main.save_suggestion(make_suggestion(
+            'abc', title='Dark mode', description='Add a dark theme'))
+        await main.save_suggestion(make_suggestion(
+            'def', title='Music channel',
+            description='A channel for sharing songs and dark ambient'))
+        await main.save_suggestion(make_suggestion(
+            'ghi', guild_id=2, title='Dark mode',
+            description='Add a dark theme'))
+        await main.write_votes([('abc', 10, 'upvote')])
+        await main.store_suggestion_status('def', 'approved')
+        return (await main.search_suggestions(1, 'dark'),
+                await main.search_suggestions(1, 'dark', 'approved'),
+                await main.search_suggestions(1, 'songs', 'pending'))
+
+    everything, approved, none = postgres(scenario)
+    total, results = everything
+    assert total == 2
+    assert results[0][:8] == ('abc', 1, None, None, 'Dark mode', 'pending',
+                              1, 0)
+    assert '**dark**' in results[0].snippet.lower()
+    assert [result.suggestion_id for result in approved[1]] == ['def']
+    assert none == (0, [])
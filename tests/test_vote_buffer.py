@@ -0,0 +1,96 @@
+import asyncio
+
+import main
+from conftest import make_suggestion
+
+
+def run_buffered(tmp_path, scenario):
+    async def wrapper():
+        buffer = main.VoteBuffer(str(tmp_path / 'journal'), interval=60,
+                                 batch_size=1000)
+        await buffer.recover()
+        await main.save_suggestion(make_suggestion('abc'))
+        try:
+            return await scenario(buffer)
+        finally:
+            await buffer.close()
+
+    return asyncio.run(wrapper())
+
+
+def test_toggle_racing_flush_removes_buffered_vote(storage, tmp_path):
+    async def scenario(buffer):
+        await buffer.toggle('abc', 11, 'upvote')
+        await buffer.flush()
+        await buffer.toggle('abc', 10, 'upvote')
+
+        # The flush swaps out the buffered upvote while the second click
+        # is waiting on its database read
+        result, _ = await asyncio.gather(buffer.toggle('abc', 10, 'upvote'),
+                                         buffer.flush())
+        await buffer.flush()
+        return result, await main.get_vote_state('abc', 10)
+
+    result, state = run_buffered(tmp_path, scenario)
+    assert result == ('upvote', None, {'upvote': 1, 'downvote': 0})
+    assert state == (None, {'upvote': 1, 'downvote': 0})
+
+
+def test_toggle_after_flush_changes_vote(storage, tmp_path):
+    async def scenario(buffer):
+        await buffer.toggle('abc', 10, 'upvote')
+        result, _ = await asyncio.gather(
+            buffer.toggle('abc', 10, 'downvote'), buffer.flush())
+        tallies = await buffer.get_votes('abc')
+        await buffer.flush()
+        return result, tallies, await main.get_vote_state('abc', 10)
+
+    result, tallies, state = run_buffered(tmp_path, scenario)
+    assert result == ('upvote', 'downvote', {'upvote': 0, 'downvote': 1})
+    assert tallies == {'upvote': 0, 'downvote': 1}
+    assert state == ('downvote', {'upvote': 0, 'downvote': 1})
+
+
+def test_flushes_commit_in_order(storage, tmp_path, monkeypatch):
+    write_votes = main.write_votes
+    calls = []
+
+    async def slow_first_write(changes):
+        # Like a pooled connection that is slower to commit the first batch
+        calls.append(changes)
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+        await write_votes(changes)
+
+    monkeypatch.setattr(main, 'write_votes', slow_first_write)
+
+    async def scenario(buffer):
+        await buffer.toggle('abc', 10, 'upvote')
+        first = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0)
+        # Waits for the flush in flight instead of reading around it
+        result = await buffer.toggle('abc', 10, 'downvote')
+        await buffer.flush()
+        with open(tmp_path / 'journal', encoding='utf-8') as f:
+            journal = f.read()
+        return (first.done(), result, journal,
+                await main.get_vote_state('abc', 10))
+
+    first_done, result, journal, state = run_buffered(tmp_path, scenario)
+    assert first_done
+    assert result == ('upvote', 'downvote', {'upvote': 0, 'downvote': 1})
+    assert journal == ''
+    assert state == ('downvote', {'upvote': 0, 'downvote': 1})
+
+
+def test_double_click_toggles_twice(storage, tmp_path):
+    async def scenario(buffer):
+        results = await asyncio.gather(buffer.toggle('abc', 10, 'upvote'),
+                                       buffer.toggle('abc', 10, 'upvote'))
+        await buffer.flush()
+        return results, await main.get_vote_state('abc', 10)
+
+    results, state = run_buffered(tmp_path, scenario)
+    assert results == [(None, 'upvote', {'upvote': 1, 'downvote': 0}),
+                       ('upvote', None, {'upvote': 0, 'downvote': 0})]
+    assert state == (None, {'upvote': 0, 'downvote': 0})